@@ -1,21 +1,37 @@
 import asyncio
 import base64
 import hashlib
+import importlib
+import importlib.util
 import json
-from collections.abc import Callable
+import random
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
 from dataclasses import dataclass
 from datetime import datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, TypeVar
 
 import aiohttp
 
 from astrbot.api import logger
 
+from .command_walker import CommandTierCollector, extract_command_tiers
 from .page_builder import CommandDocItem
 
 if TYPE_CHECKING:
     from astrbot.api import AstrBotConfig
 
+    from .http_session import HttpSessionManager
+
+_T = TypeVar("_T")
+
+# Payloads at least this large (or of unknown size) are parsed incrementally
+# when the optional ``ijson`` package is installed.
+STREAM_PARSE_MIN_BYTES = 256 * 1024
+# Background token renewal re-logs in this long before the JWT ``exp``.
+TOKEN_RENEW_AHEAD_SECONDS = 120
+TOKEN_RENEW_MIN_DELAY_SECONDS = 30
+
 
 class HelpMenuError(Exception):
     """Base exception for help menu errors."""
@@ -34,6 +50,96 @@ class HttpStatusError(HelpMenuError):
         self.status = status
 
 
+class CircuitOpenError(HelpMenuError):
+    """Raised when requests are short-circuited after repeated failures."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(
+            "熔断", f"Dashboard 连续请求失败，熔断中，约 {retry_after:.0f} 秒后恢复"
+        )
+        self.retry_after = retry_after
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """Check whether an error is worth retrying (network issue or HTTP 5xx)."""
+    if isinstance(exc, HttpStatusError):
+        return exc.status >= 500
+    return isinstance(exc, (aiohttp.ClientConnectionError, asyncio.TimeoutError))
+
+
+@dataclass
+class RetryPolicy:
+    """Capped exponential backoff with full jitter for idempotent requests."""
+
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+
+    def compute_delay(self, attempt: int) -> float:
+        """Return the sleep before retry number ``attempt`` (1-based)."""
+        capped = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, capped)
+
+
+class CircuitBreaker:
+    """Fail fast for a cool-down period after repeated transient failures."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        cooldown_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown_seconds = cooldown_seconds
+        self._clock = clock
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+
+    def retry_after(self) -> float:
+        """Seconds left until an open circuit lets a probe request through."""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.cooldown_seconds - self._clock())
+
+    def before_request(self) -> None:
+        """Raise ``CircuitOpenError`` while the circuit is open."""
+        if self.state != self.OPEN:
+            return
+        remaining = self.retry_after()
+        if remaining > 0:
+            raise CircuitOpenError(remaining)
+        self.state = self.HALF_OPEN
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if (
+            self.state == self.HALF_OPEN
+            or self.consecutive_failures >= self.failure_threshold
+        ):
+            self.state = self.OPEN
+            self._opened_at = self._clock()
+
+    def describe(self) -> str:
+        """Human readable state for refresh messages."""
+        if self.state == self.OPEN:
+            return f"熔断中，约 {self.retry_after():.0f} 秒后恢复"
+        if self.state == self.HALF_OPEN:
+            return "熔断试探中"
+        if self.consecutive_failures:
+            return f"连续失败 {self.consecutive_failures}/{self.failure_threshold} 次"
+        return "正常"
+
+
 @dataclass
 class ApiClientState:
     """Internal state for API client."""
@@ -42,6 +148,23 @@ class ApiClientState:
     token_expire_at: int = 0
     cached_admin_name: str = ""
     cached_admin_password: str = ""
+    commands_etag: str = ""
+    commands_last_modified: str = ""
+    commands_body_hash: str = ""
+    command_item_tiers: tuple[list[CommandDocItem], list[CommandDocItem]] | None = None
+
+
+class _HashingStreamReader:
+    """Async reader wrapper that hashes every chunk it hands out."""
+
+    def __init__(self, stream: aiohttp.StreamReader, digest: "hashlib._Hash"):
+        self._stream = stream
+        self._digest = digest
+
+    async def read(self, size: int = -1) -> bytes:
+        chunk = await self._stream.read(size)
+        self._digest.update(chunk)
+        return chunk
 
 
 class ApiClient:
@@ -52,16 +175,29 @@ class ApiClient:
         config: "AstrBotConfig",
         log_callback: Callable[[str], None] | None = None,
         log_debug_callback: Callable[[str], None] | None = None,
+        retry_policy: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        session_manager: "HttpSessionManager | None" = None,
     ):
         self.config = config
+        self._session_manager = session_manager
         self._state = ApiClientState()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        # Backoff waits go through this hook so tests can replace real time.
+        self._sleep: Callable[[float], Awaitable[object]] = asyncio.sleep
         self._http_session: aiohttp.ClientSession | None = None
         self._http_session_lock = asyncio.Lock()
         self._log = log_callback or (lambda msg: logger.info(f"[helpmenu] {msg}"))
         self._log_debug = log_debug_callback or (lambda msg: None)
+        self.last_fetch_unchanged = False
+        self._token_renew_task: asyncio.Task | None = None
+        self._login_task: asyncio.Task[str] | None = None
 
     async def _get_http_session(self) -> aiohttp.ClientSession:
         """Get or create HTTP session."""
+        if self._session_manager is not None:
+            return await self._session_manager.get_session()
         if self._http_session and not self._http_session.closed:
             return self._http_session
 
@@ -71,14 +207,41 @@ class ApiClient:
             self._http_session = aiohttp.ClientSession(trust_env=False)
             return self._http_session
 
+    def _get_timeout(self, profile: str, total: float) -> aiohttp.ClientTimeout:
+        """Get request timeout from the shared session manager if available."""
+        if self._session_manager is not None:
+            return self._session_manager.timeout(profile)
+        return aiohttp.ClientTimeout(total=total)
+
     async def close(self) -> None:
-        """Close HTTP session and cleanup."""
+        """Close HTTP session and cleanup.
+
+        A shared ``HttpSessionManager`` is owned by the caller and left open.
+        """
+        if self._token_renew_task and not self._token_renew_task.done():
+            self._token_renew_task.cancel()
+            try:
+                await self._token_renew_task
+            except asyncio.CancelledError:
+                pass
+        self._token_renew_task = None
+        if self._login_task and not self._login_task.done():
+            self._login_task.cancel()
+        self._login_task = None
         async with self._http_session_lock:
             if self._http_session and not self._http_session.closed:
                 await self._http_session.close()
             self._http_session = None
         self._state.auth_token = ""
         self._state.token_expire_at = 0
+        self._reset_command_cache()
+
+    def _reset_command_cache(self) -> None:
+        """Forget cached command list validators and parsed tiers."""
+        self._state.commands_etag = ""
+        self._state.commands_last_modified = ""
+        self._state.commands_body_hash = ""
+        self._state.command_item_tiers = None
 
     def _get_base_url(self) -> str:
         """Get base URL for API requests."""
@@ -174,6 +337,18 @@ class ApiClient:
                 f"{stage}返回了无效 JSON（HTTP {response.status}，响应片段: {body_preview or '空'}）"
             ) from exc
 
+    def _parse_json_body(self, body: bytes, status: int, stage: str) -> object:
+        """Parse JSON from an already downloaded response body."""
+        try:
+            return json.loads(body)
+        except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+            body_preview = (
+                body.decode("utf-8", errors="replace").strip().replace("\n", " ")[:200]
+            )
+            raise ValueError(
+                f"{stage}返回了无效 JSON（HTTP {status}，响应片段: {body_preview or '空'}）"
+            ) from exc
+
     def _raise_for_http_status(
         self, response: aiohttp.ClientResponse, stage: str
     ) -> None:
@@ -202,7 +377,7 @@ class ApiClient:
         }
         self._log_debug(f"登录地址: {login_url}")
 
-        timeout = aiohttp.ClientTimeout(total=12)
+        timeout = self._get_timeout("login", 12)
         session = await self._get_http_session()
         async with session.post(login_url, json=payload, timeout=timeout) as response:
             self._log_debug(f"登录状态码: {response.status}")
@@ -243,139 +418,324 @@ class ApiClient:
                 )
             else:
                 self._log_debug("登录成功，未解析到 Token 过期时间。")
+            self._schedule_token_renewal()
             return token
 
-    async def _get_or_refresh_token(self, force_login: bool = False) -> str:
-        """Get existing token or refresh if expired."""
+    def _is_token_auto_renew_enabled(self) -> bool:
+        return bool(self.config.get("api_token_auto_renew", False))
+
+    def _schedule_token_renewal(self) -> None:
+        """Start the background renewal task if enabled and not running."""
+        if not self._is_token_auto_renew_enabled():
+            return
+        if self._state.token_expire_at <= 0:
+            self._log_debug("Token 未携带过期时间，跳过后台续期。")
+            return
+        if self._token_renew_task and not self._token_renew_task.done():
+            return
+        self._token_renew_task = asyncio.create_task(self._run_token_renewal())
+
+    async def _run_token_renewal(self) -> None:
+        """Re-login ahead of token expiry so refreshes always find a valid token."""
+        while self._is_token_auto_renew_enabled() and self._state.token_expire_at > 0:
+            now = datetime.now().timestamp()
+            delay = max(
+                TOKEN_RENEW_MIN_DELAY_SECONDS,
+                self._state.token_expire_at - TOKEN_RENEW_AHEAD_SECONDS - now,
+            )
+            self._log_debug(f"将在 {delay:.0f} 秒后后台续期 Token。")
+            await self._sleep(delay)
+            try:
+                await self._login_single_flight()
+                self._log_debug("后台 Token 续期成功。")
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # noqa: BLE001
+                self._log_debug(
+                    f"后台 Token 续期失败，将稍后重试: {type(exc).__name__}: {exc}"
+                )
+                await self._sleep(TOKEN_RENEW_MIN_DELAY_SECONDS)
+
+    async def _get_or_refresh_token(
+        self, force_login: bool = False, stale_token: str = ""
+    ) -> str:
+        """Get existing token or refresh if expired.
+
+        Args:
+            force_login: Always log in again.
+            stale_token: A token that was just rejected (401). Only this exact
+                token is invalidated; a newer token obtained meanwhile by a
+                concurrent caller is reused instead of logging in again.
+        """
+        if stale_token:
+            if self._state.auth_token == stale_token:
+                self._state.auth_token = ""
+                self._state.token_expire_at = 0
+            elif not self._is_token_expired():
+                self._log_debug("被拒绝的 Token 已被其他请求刷新，复用新 Token。")
+                return self._state.auth_token
         if not force_login and not self._is_token_expired():
             self._log_debug("复用内存中的 Token。")
             return self._state.auth_token
         self._log_debug("Token 不可用或已过期，尝试重新登录。")
-        return await self._login_and_get_token()
+        return await self._login_single_flight()
+
+    async def _login_single_flight(self) -> str:
+        """Log in, sharing one in-flight login between concurrent callers."""
+        task = self._login_task
+        if task is None or task.done():
+            task = asyncio.create_task(
+                self._call_with_circuit(self._login_and_get_token)
+            )
+            # Consume the result so an unawaited failure is not reported as
+            # "exception was never retrieved" when every waiter was cancelled.
+            task.add_done_callback(lambda done: done.cancelled() or done.exception())
+            self._login_task = task
+        else:
+            self._log_debug("已有登录请求进行中，等待其结果。")
+        return await asyncio.shield(task)
+
+    async def _call_with_circuit(
+        self, operation: Callable[[], Awaitable[_T]], retry: bool = False
+    ) -> _T:
+        """Run a request through the circuit breaker.
+
+        With ``retry`` enabled (idempotent GETs only), transient failures are
+        retried with capped exponential backoff and jitter.
+        """
+        attempt = 0
+        while True:
+            self.circuit_breaker.before_request()
+            attempt += 1
+            try:
+                result = await operation()
+            except Exception as exc:
+                if not is_transient_error(exc):
+                    raise
+                self.circuit_breaker.record_failure()
+                if (
+                    not retry
+                    or attempt >= self.retry_policy.max_attempts
+                    or self.circuit_breaker.state == CircuitBreaker.OPEN
+                ):
+                    raise
+                delay = self.retry_policy.compute_delay(attempt)
+                self._log_debug(
+                    f"请求失败({type(exc).__name__}: {exc})，{delay:.2f} 秒后进行第 "
+                    f"{attempt + 1}/{self.retry_policy.max_attempts} 次尝试。"
+                )
+                await self._sleep(delay)
+                continue
+            self.circuit_breaker.record_success()
+            return result
+
+    def describe_circuit_state(self) -> str:
+        """Describe the circuit breaker state for refresh messages."""
+        return self.circuit_breaker.describe()
+
+    def _build_conditional_headers(self) -> dict[str, str]:
+        """Build conditional GET headers from the last command list response."""
+        headers: dict[str, str] = {}
+        if self._state.command_item_tiers is None:
+            return headers
+        if self._state.commands_etag:
+            headers["If-None-Match"] = self._state.commands_etag
+        if self._state.commands_last_modified:
+            headers["If-Modified-Since"] = self._state.commands_last_modified
+        return headers
+
+    def _should_stream_response(self, response: aiohttp.ClientResponse) -> bool:
+        """Check whether the command list should be parsed incrementally."""
+        if importlib.util.find_spec("ijson") is None:
+            return False
+        content_length = response.content_length
+        return content_length is None or content_length >= STREAM_PARSE_MIN_BYTES
 
-    async def _fetch_command_items(self, token: str) -> list[dict]:
-        """Fetch command list from API."""
+    async def _iter_streamed_command_items(
+        self, stream: "_HashingStreamReader", summary: dict[str, object]
+    ) -> AsyncIterator[object]:
+        """Yield ``data.items[*]`` objects as they arrive from the stream.
+
+        Top-level ``status``/``message`` and the shape of ``data``/``items``
+        are recorded into ``summary`` for validation after the stream ends.
+        """
+        ijson = importlib.import_module("ijson")
+        builder = None
+        depth = 0
+        async for prefix, event, value in ijson.parse_async(stream, use_float=True):
+            if builder is not None:
+                builder.event(event, value)
+                if event in {"start_map", "start_array"}:
+                    depth += 1
+                elif event in {"end_map", "end_array"}:
+                    depth -= 1
+                    if depth == 0:
+                        yield builder.value
+                        builder = None
+                continue
+
+            if prefix == "data.items.item":
+                if event in {"start_map", "start_array"}:
+                    builder = ijson.ObjectBuilder()
+                    builder.event(event, value)
+                    depth = 1
+                continue
+            if prefix == "":
+                summary.setdefault("root_type", event)
+            elif prefix in {"status", "message"} and event in {"string", "number"}:
+                summary[prefix] = value
+            elif prefix == "data":
+                summary.setdefault("data_type", event)
+            elif prefix == "data.items":
+                summary.setdefault("items_type", event)
+
+    async def _stream_command_item_tiers(
+        self, response: aiohttp.ClientResponse
+    ) -> tuple[tuple[list[CommandDocItem], list[CommandDocItem]], str]:
+        """Parse the command list incrementally and return (tiers, body hash)."""
+        ijson = importlib.import_module("ijson")
+        digest = hashlib.sha256()
+        stream = _HashingStreamReader(response.content, digest)
+        summary: dict[str, object] = {}
+        collector = CommandTierCollector()
+        try:
+            async for item in self._iter_streamed_command_items(stream, summary):
+                collector.add(item)
+        except ijson.JSONError as exc:
+            raise ValueError(
+                f"命令接口返回了无效 JSON（HTTP {response.status}，流式解析失败: {' '.join(str(exc).split())[:200]}）"
+            ) from exc
+
+        if summary.get("root_type") != "start_map":
+            raise ValueError("命令接口返回格式异常: 顶层不是对象")
+        status = str(summary.get("status") or "").lower()
+        message = str(summary.get("message") or "").strip()
+        if status != "ok":
+            raise ValueError(f"获取命令列表失败: {message or '未知错误'}")
+        if summary.get("data_type") != "start_map":
+            raise ValueError("命令接口中的 data 字段异常: 不是对象")
+        items_type = summary.get("items_type")
+        if items_type is not None and items_type != "start_array":
+            raise ValueError(f"命令接口中的 items 字段异常: {items_type}")
+        self._log_debug(f"命令总数(原始，流式解析): {collector.raw_count}")
+        return collector.finish(), digest.hexdigest()
+
+    def _remember_command_validators(
+        self, etag: str, last_modified: str, body_hash: str
+    ) -> None:
+        """Store validators of the last successfully handled command list."""
+        self._state.commands_etag = etag
+        self._state.commands_last_modified = last_modified
+        self._state.commands_body_hash = body_hash
+
+    async def _fetch_command_item_tiers(
+        self, token: str
+    ) -> tuple[list[CommandDocItem], list[CommandDocItem]] | None:
+        """Fetch command list from API and split it into permission tiers.
+
+        Returns ``None`` when the command list is unchanged since the last
+        successful fetch (HTTP 304 or identical response body).
+        """
         base_url = self._get_base_url()
         commands_url = f"{base_url}/api/commands"
-        headers = {"Authorization": f"Bearer {token}"}
-        timeout = aiohttp.ClientTimeout(total=18)
+        headers = {
+            "Authorization": f"Bearer {token}",
+            **self._build_conditional_headers(),
+        }
+        timeout = self._get_timeout("commands", 18)
         self._log_debug(f"命令列表地址: {commands_url}")
         session = await self._get_http_session()
         async with session.get(
             commands_url, headers=headers, timeout=timeout
         ) as response:
             self._log_debug(f"命令列表状态码: {response.status}")
+            if response.status == 304 and self._state.command_item_tiers is not None:
+                self._log_debug("命令列表未修改(304)，复用上次解析结果。")
+                return None
             self._raise_for_http_status(response, "命令列表")
-            data = await self._read_json_response(response, "命令接口")
-            if not isinstance(data, dict):
-                raise ValueError(
-                    f"命令接口返回格式异常: {type(data).__name__}",
-                )
-
-            status = str(data.get("status") or "").lower()
-            message = str(data.get("message") or "").strip()
-            if status != "ok":
-                raise ValueError(f"获取命令列表失败: {message or '未知错误'}")
-
-            data_node = data.get("data")
-            if not isinstance(data_node, dict):
-                raise ValueError(
-                    f"命令接口中的 data 字段异常: {data_node}",
+            etag = response.headers.get("ETag", "")
+            last_modified = response.headers.get("Last-Modified", "")
+            if self._should_stream_response(response):
+                tiers, body_hash = await self._stream_command_item_tiers(response)
+                unchanged = (
+                    body_hash == self._state.commands_body_hash
+                    and self._state.command_item_tiers is not None
                 )
+                self._remember_command_validators(etag, last_modified, body_hash)
+                if unchanged:
+                    self._log_debug("命令列表响应内容未变化，复用上次解析结果。")
+                    return None
+                return tiers
+            body = await response.read()
+
+        body_hash = hashlib.sha256(body).hexdigest()
+        if (
+            body_hash == self._state.commands_body_hash
+            and self._state.command_item_tiers is not None
+        ):
+            self._log_debug("命令列表响应内容未变化，跳过 JSON 解析。")
+            self._remember_command_validators(etag, last_modified, body_hash)
+            return None
+
+        data = self._parse_json_body(body, response.status, "命令接口")
+        if not isinstance(data, dict):
+            raise ValueError(
+                f"命令接口返回格式异常: {type(data).__name__}",
+            )
 
-            items = data_node.get("items", [])
-            if not isinstance(items, list):
-                raise ValueError(
-                    f"命令接口中的 items 字段异常: {type(items).__name__}",
-                )
-            self._log_debug(f"命令总数(原始): {len(items)}")
-            return items
-
-    def _can_show_command(
-        self, permission: str, include_admin_commands: bool = False
-    ) -> bool:
-        """Check if command should be shown based on permission."""
-        normalized = (permission or "everyone").strip().lower()
-        if normalized in {"", "everyone", "member"}:
-            return True
-        if include_admin_commands and normalized == "admin":
-            return True
-        return False
+        status = str(data.get("status") or "").lower()
+        message = str(data.get("message") or "").strip()
+        if status != "ok":
+            raise ValueError(f"获取命令列表失败: {message or '未知错误'}")
 
-    def _clean_text(self, value: str | None, default: str) -> str:
-        """Clean and normalize text."""
-        import re
+        data_node = data.get("data")
+        if not isinstance(data_node, dict):
+            raise ValueError(
+                f"命令接口中的 data 字段异常: {data_node}",
+            )
 
-        text = re.sub(r"\s+", " ", (value or "").strip())
-        if not text:
-            return default
-        if len(text) > 120:
-            return f"{text[:117]}..."
-        return text
+        items = data_node.get("items", [])
+        if not isinstance(items, list):
+            raise ValueError(
+                f"命令接口中的 items 字段异常: {type(items).__name__}",
+            )
+        self._log_debug(f"命令总数(原始): {len(items)}")
+        tiers = self._extract_allowed_item_tiers(items)
+        self._remember_command_validators(etag, last_modified, body_hash)
+        return tiers
 
-    def _extract_allowed_items(
-        self, raw_items: list[dict], include_admin_commands: bool = False
-    ) -> list[CommandDocItem]:
-        """Extract allowed command items from raw API response."""
-        collected: list[CommandDocItem] = []
-        dedup: set[str] = set()
-        excluded_plugins = {"builtin_commands"}
+    def _extract_allowed_item_tiers(
+        self, raw_items: list[dict]
+    ) -> tuple[list[CommandDocItem], list[CommandDocItem]]:
+        """Walk raw API items once and split them into (public, admin) tiers.
 
-        def walk(items: list[dict]) -> None:
-            for item in items:
-                if not isinstance(item, dict):
-                    continue
+        Both lists share the same ``CommandDocItem`` objects.
+        """
+        return extract_command_tiers(raw_items)
 
-                plugin_id = str(item.get("plugin") or "").strip()
-                if plugin_id in excluded_plugins:
-                    continue
+    async def _fetch_command_tiers_with_relogin(
+        self,
+    ) -> tuple[list[CommandDocItem], list[CommandDocItem]] | None:
+        """Fetch command tiers, re-logging in once on 401.
 
-                item_type = item.get("type", "")
-                enabled = item.get("enabled", False)
-                permission = str(item.get("permission") or "").strip().lower()
+        Returns ``None`` when the command list is unchanged.
+        """
+        if not self.has_credentials():
+            raise ValueError(
+                "插件配置缺少 admin_name 或 admin_password，请先填写。",
+            )
 
-                if (
-                    item_type in {"command", "sub_command"}
-                    and enabled
-                    and self._can_show_command(permission, include_admin_commands)
-                ):
-                    command = self._clean_text(item.get("effective_command"), "")
-                    if command:
-                        plugin_name = self._clean_text(
-                            item.get("plugin_display_name"), ""
-                        ) or self._clean_text(item.get("plugin"), "未知插件")
-                        description = self._clean_text(
-                            item.get("description"), "暂无说明。"
-                        )
-                        raw_aliases = item.get("aliases", [])
-                        aliases: list[str] = []
-                        if isinstance(raw_aliases, list):
-                            for alias in raw_aliases:
-                                if not isinstance(alias, str):
-                                    continue
-                                alias_text = self._clean_text(alias, "")
-                                if alias_text:
-                                    aliases.append(alias_text)
-                        dedup_key = f"{plugin_name}|{command}"
-                        if dedup_key not in dedup:
-                            dedup.add(dedup_key)
-                            collected.append(
-                                CommandDocItem(
-                                    plugin_name=plugin_name,
-                                    command=command,
-                                    description=description,
-                                    aliases=aliases,
-                                    permission=permission or "everyone",
-                                ),
-                            )
-
-                sub_commands = item.get("sub_commands", [])
-                if isinstance(sub_commands, list) and sub_commands:
-                    walk(sub_commands)
-
-        walk(raw_items)
-        collected.sort(key=lambda x: (x.plugin_name.lower(), x.command.lower()))
-        return collected
+        token = await self._get_or_refresh_token()
+        try:
+            return await self._call_with_circuit(
+                lambda: self._fetch_command_item_tiers(token), retry=True
+            )
+        except PermissionError:
+            self._log_debug("命令接口返回 401，尝试用内存凭据重新登录后重试。")
+            token = await self._get_or_refresh_token(stale_token=token)
+            return await self._call_with_circuit(
+                lambda: self._fetch_command_item_tiers(token), retry=True
+            )
 
     async def fetch_commands(
         self, include_admin_commands: bool = False
@@ -394,20 +754,34 @@ class ApiClient:
             HttpStatusError: If HTTP request fails.
             aiohttp.ClientError: If network request fails.
         """
-        if not self.has_credentials():
-            raise ValueError(
-                "插件配置缺少 admin_name 或 admin_password，请先填写。",
-            )
+        public_items, admin_items = await self.fetch_command_tiers()
+        return admin_items if include_admin_commands else public_items
 
-        token = await self._get_or_refresh_token()
-        try:
-            raw_items = await self._fetch_command_items(token)
-        except PermissionError:
-            self._log_debug("命令接口返回 401，尝试用内存凭据重新登录后重试。")
-            token = await self._get_or_refresh_token(force_login=True)
-            raw_items = await self._fetch_command_items(token)
+    async def fetch_command_tiers(
+        self,
+    ) -> tuple[list[CommandDocItem], list[CommandDocItem]]:
+        """Fetch commands once and return both permission tiers.
+
+        Returns:
+            Tuple of (public items, admin items); admin items include the
+            public ones and both lists share the same objects.
 
-        return self._extract_allowed_items(raw_items, include_admin_commands)
+        Raises:
+            ValueError: If credentials are missing or API returns invalid data.
+            PermissionError: If authentication fails.
+            HttpStatusError: If HTTP request fails.
+            aiohttp.ClientError: If network request fails.
+        """
+        tiers = await self._fetch_command_tiers_with_relogin()
+        cached_tiers = self._state.command_item_tiers
+        if tiers is None and cached_tiers is not None:
+            self.last_fetch_unchanged = True
+            return cached_tiers
+
+        tiers = tiers or ([], [])
+        self._state.command_item_tiers = tiers
+        self.last_fetch_unchanged = False
+        return tiers
 
     def clear_cached_credentials(self) -> None:
         """Clear cached credentials from state."""
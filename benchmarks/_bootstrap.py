@@ -0,0 +1,41 @@
+"""Load plugin modules outside AstrBot for local benchmarks.
+
+The plugin directory is registered as a package so relative imports keep
+working. When AstrBot itself is not installed, a minimal ``astrbot.api`` shim
+(logger + dict-based config) is provided; this is only enough for the
+framework-independent modules (api_client, page_builder, session_store, ...).
+"""
+
+from __future__ import annotations
+
+import importlib
+import importlib.util
+import logging
+import sys
+import types
+from pathlib import Path
+
+PLUGIN_ROOT = Path(__file__).resolve().parent.parent
+PACKAGE_NAME = "helpmenu_plugin"
+
+
+def _install_astrbot_shim() -> None:
+    if "astrbot" in sys.modules or importlib.util.find_spec("astrbot") is not None:
+        return
+    astrbot = types.ModuleType("astrbot")
+    astrbot_api = types.ModuleType("astrbot.api")
+    astrbot_api.logger = logging.getLogger("helpmenu.bench")
+    astrbot_api.AstrBotConfig = dict
+    astrbot.api = astrbot_api
+    sys.modules.setdefault("astrbot", astrbot)
+    sys.modules.setdefault("astrbot.api", astrbot_api)
+
+
+def load_plugin_module(name: str) -> types.ModuleType:
+    """Import ``<plugin>/<name>.py`` as a submodule of the plugin package."""
+    _install_astrbot_shim()
+    if PACKAGE_NAME not in sys.modules:
+        package = types.ModuleType(PACKAGE_NAME)
+        package.__path__ = [str(PLUGIN_ROOT)]
+        sys.modules[PACKAGE_NAME] = package
+    return importlib.import_module(f"{PACKAGE_NAME}.{name}")
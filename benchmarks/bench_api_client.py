@@ -0,0 +1,105 @@
+"""Benchmark ``ApiClient.fetch_commands`` against the local dashboard stub.
+
+Reports refresh latency (cold: login + fetch, warm: fetch with a cached token,
+unchanged: conditional fetch answered with 304) and the tracemalloc peak of a
+single warm refresh, at 100, 1k and 10k commands.
+
+    python benchmarks/bench_api_client.py
+    python benchmarks/bench_api_client.py --sizes 100 1000 --rounds 10 --etag
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+
+from _bootstrap import load_plugin_module
+from dashboard_stub import DashboardStub, StubOptions
+
+api_client = load_plugin_module("api_client")
+
+
+def _make_client(stub: DashboardStub, session_manager=None):
+    config = {
+        "ASTRHost": stub.base_url,
+        "admin_name": stub.options.username,
+        "admin_password": stub.options.password,
+    }
+    return api_client.ApiClient(config, session_manager=session_manager)
+
+
+def _ms(samples: list[float]) -> str:
+    if not samples:
+        return "-"
+    return f"{statistics.median(samples) * 1000:8.1f}"
+
+
+async def _timed(coro) -> tuple[float, object]:
+    started = time.perf_counter()
+    result = await coro
+    return time.perf_counter() - started, result
+
+
+async def bench_size(commands: int, rounds: int, etag: bool, latency_ms: float):
+    stub = DashboardStub(
+        StubOptions(commands=commands, etag=etag, latency_ms=latency_ms)
+    )
+    await stub.start()
+    try:
+        cold: list[float] = []
+        for _ in range(rounds):
+            client = _make_client(stub)
+            elapsed, _ = await _timed(client.fetch_commands(True))
+            cold.append(elapsed)
+            await client.close()
+
+        client = _make_client(stub)
+        _, items = await _timed(client.fetch_commands(True))
+        warm: list[float] = []
+        unchanged: list[float] = []
+        for _ in range(rounds):
+            # Drop validators so the server has to send the full body again.
+            client._reset_command_cache()
+            elapsed, _ = await _timed(client.fetch_commands(True))
+            warm.append(elapsed)
+        if etag:
+            for _ in range(rounds):
+                elapsed, _ = await _timed(client.fetch_commands(True))
+                unchanged.append(elapsed)
+
+        client._reset_command_cache()
+        tracemalloc.start()
+        await client.fetch_commands(True)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        await client.close()
+    finally:
+        await stub.stop()
+
+    print(
+        f"{commands:>7} {len(items):>7} {_ms(cold)} {_ms(warm)} {_ms(unchanged)}"
+        f" {peak / 1024 / 1024:9.2f} {len(stub._body) / 1024:9.1f}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--etag", action="store_true", help="serve ETag / 304")
+    args = parser.parse_args()
+
+    print(
+        f"{'nodes':>7} {'shown':>7} {'cold ms':>8} {'warm ms':>8} {'304 ms':>8}"
+        f" {'peak MiB':>9} {'body KiB':>9}"
+    )
+    for size in args.sizes:
+        await bench_size(size, args.rounds, args.etag, args.latency_ms)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
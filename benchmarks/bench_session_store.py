@@ -0,0 +1,105 @@
+"""Concurrency benchmark: global-lock OrderedDict vs ShardedSessionStore.
+
+Simulates a burst of ``/helpMenu next`` calls from many chats. Each call reads
+the current page and writes the next one under the store's lock; ``--hold-ms``
+adds an await inside the critical section (e.g. a lazy load from disk), which
+is where a single global lock serializes unrelated chats.
+
+    python benchmarks/bench_session_store.py --sessions 5000 --calls 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from collections import OrderedDict
+
+from _bootstrap import load_plugin_module
+
+session_store = load_plugin_module("session_store")
+
+
+class GlobalLockStore:
+    """The previous design: one OrderedDict LRU behind one asyncio.Lock."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.entries: OrderedDict[str, int] = OrderedDict()
+        self.lock = asyncio.Lock()
+
+    def lock_for(self, key: str) -> asyncio.Lock:
+        return self.lock
+
+    def get(self, key: str) -> int | None:
+        page = self.entries.get(key)
+        if page is not None:
+            self.entries.move_to_end(key)
+        return page
+
+    def set(self, key: str, page: int) -> None:
+        self.entries[key] = page
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+
+async def navigate(store, key: str, hold: float, latencies: list[float]) -> None:
+    started = time.perf_counter()
+    async with store.lock_for(key):
+        page = store.get(key) or 1
+        if hold:
+            await asyncio.sleep(hold)
+        store.set(key, page + 1)
+    latencies.append(time.perf_counter() - started)
+
+
+async def run(store, keys: list[str], concurrency: int, hold: float) -> str:
+    latencies: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(key: str) -> None:
+        async with semaphore:
+            await navigate(store, key, hold, latencies)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(key) for key in keys))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    return (
+        f"{len(keys) / elapsed:10.0f} ops/s  "
+        f"p50 {statistics.median(latencies) * 1000:7.2f} ms  p99 {p99 * 1000:7.2f} ms"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=256)
+    parser.add_argument("--max-size", type=int, default=1024)
+    parser.add_argument("--shards", type=int, default=16)
+    parser.add_argument("--hold-ms", type=float, nargs="+", default=[0.0, 1.0])
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    keys = [f"group_{rng.randrange(args.sessions)}" for _ in range(args.calls)]
+    for hold_ms in args.hold_ms:
+        print(f"hold {hold_ms} ms inside the critical section")
+        for label, store in (
+            ("global lock", GlobalLockStore(args.max_size)),
+            (
+                f"{args.shards} shards",
+                session_store.ShardedSessionStore(args.max_size, args.shards),
+            ),
+        ):
+            print(
+                f"  {label:<12} {await run(store, keys, args.concurrency, hold_ms / 1000)}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+"""Event-loop blocking during a help-cache rebuild: inline vs worker thread.
+
+Builds both permission tiers for N synthetic commands while a ticker task
+sleeps in 1 ms steps on the same loop. The ticker's worst overshoot is how
+long every other chat on the process would have been stalled.
+
+    python benchmarks/bench_snapshot_build.py --sizes 1000 5000 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from _bootstrap import load_plugin_module
+
+page_builder = load_plugin_module("page_builder")
+snapshot_builder = load_plugin_module("snapshot_builder")
+
+TICK_SECONDS = 0.001
+
+
+def make_candidates(count: int) -> list:
+    permissions = ("everyone", "member", "admin")
+    return [
+        page_builder.CommandDocItem(
+            plugin_name=f"plugin_{index % 97:02d}",
+            command=f"cmd_{index}",
+            description=f"第 {index} 条命令的说明，带参数 <name> [count]",
+            aliases=[f"c{index}"] if index % 3 == 0 else [],
+            permission=permissions[index % 3],
+        )
+        for index in range(count)
+    ]
+
+
+def build(candidates: list) -> None:
+    public_items, admin_items = snapshot_builder.split_permission_tiers(candidates)
+    snapshot_builder.build_help_snapshots(
+        "metadata", "api", None, public_items, admin_items, "", "now"
+    )
+
+
+async def measure(candidates: list, offload: bool) -> tuple[float, float]:
+    """Return (wall time of the build, worst ticker overshoot) in seconds."""
+    worst_lag = 0.0
+    done = asyncio.Event()
+
+    async def ticker() -> None:
+        nonlocal worst_lag
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(TICK_SECONDS)
+            worst_lag = max(worst_lag, time.perf_counter() - started - TICK_SECONDS)
+
+    ticker_task = asyncio.create_task(ticker())
+    await asyncio.sleep(TICK_SECONDS * 5)
+    started = time.perf_counter()
+    if offload:
+        await asyncio.to_thread(build, candidates)
+    else:
+        build(candidates)
+    elapsed = time.perf_counter() - started
+    await asyncio.sleep(TICK_SECONDS * 5)
+    done.set()
+    await ticker_task
+    return elapsed, worst_lag
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        candidates = make_candidates(size)
+        for label, offload in (("inline", False), ("to_thread", True)):
+            runs = [await measure(candidates, offload) for _ in range(args.rounds)]
+            elapsed = min(run[0] for run in runs)
+            lag = max(run[1] for run in runs)
+            print(
+                f"{size:>6} commands  {label:<9}  build {elapsed * 1000:8.1f} ms  "
+                f"max loop stall {lag * 1000:8.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,283 @@
+"""Local stand-in for the AstrBot dashboard API used by API mode.
+
+Implements ``POST /api/auth/login`` (MD5 password, HS256 JWT with ``exp``) and
+``GET /api/commands`` with a synthetic, nested ``sub_commands`` tree. Latency,
+401s, 5xx errors and malformed JSON can be injected to exercise ``ApiClient``
+under failures.
+
+Run standalone:
+
+    python benchmarks/dashboard_stub.py --port 6185 --commands 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from aiohttp import web
+
+if TYPE_CHECKING:
+    from typing import Self
+
+
+@dataclass
+class StubOptions:
+    """Behaviour of the stand-in dashboard."""
+
+    username: str = "astrbot"
+    password: str = "astrbot"
+    commands: int = 100
+    plugins: int = 20
+    fanout: int = 4
+    depth: int = 2
+    admin_ratio: float = 0.2
+    disabled_ratio: float = 0.05
+    token_ttl: int = 3600
+    latency_ms: float = 0.0
+    unauthorized_rate: float = 0.0
+    server_error_rate: float = 0.0
+    malformed_rate: float = 0.0
+    etag: bool = False
+    seed: int = 7
+
+
+@dataclass
+class StubCounters:
+    """Request counters, handy for asserting client behaviour."""
+
+    logins: int = 0
+    commands: int = 0
+    not_modified: int = 0
+    injected: dict[str, int] = field(
+        default_factory=lambda: {"401": 0, "5xx": 0, "malformed": 0}
+    )
+
+
+def generate_command_items(options: StubOptions) -> list[dict]:
+    """Build ``options.commands`` nodes spread over nested command groups."""
+    rng = random.Random(options.seed)
+    remaining = max(0, options.commands)
+    items: list[dict] = []
+    serial = 0
+
+    def make_node(plugin_index: int, path: str, level: int) -> dict:
+        nonlocal remaining, serial
+        remaining -= 1
+        serial += 1
+        plugin_id = f"plugin_{plugin_index}"
+        name = f"{path} c{serial}".strip()
+        is_group = level < options.depth and remaining >= options.fanout
+        node = {
+            "plugin": plugin_id,
+            "plugin_display_name": f"示例插件 {plugin_index}",
+            "type": "group" if is_group else "command" if level == 0 else "sub_command",
+            "enabled": rng.random() >= options.disabled_ratio,
+            "permission": "admin" if rng.random() < options.admin_ratio else "everyone",
+            "effective_command": name,
+            "description": f"用于演示的第 {serial} 条命令。  Arg目标: 名称",
+            "aliases": [f"a{serial}"] if serial % 3 == 0 else [],
+            "sub_commands": [],
+        }
+        if is_group:
+            for _ in range(options.fanout):
+                if remaining <= 0:
+                    break
+                node["sub_commands"].append(make_node(plugin_index, name, level + 1))
+        return node
+
+    while remaining > 0:
+        items.append(make_node(len(items) % max(1, options.plugins), "", 0))
+    return items
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+class DashboardStub:
+    """aiohttp application emulating the dashboard endpoints."""
+
+    def __init__(self, options: StubOptions | None = None):
+        self.options = options or StubOptions()
+        self.counters = StubCounters()
+        self._secret = b"helpmenu-dashboard-stub"
+        self._rng = random.Random(self.options.seed)
+        self._runner: web.AppRunner | None = None
+        self.base_url = ""
+        self.set_items(generate_command_items(self.options))
+
+    def set_items(self, items: list[dict]) -> None:
+        """Replace the served command tree."""
+        payload = {"status": "ok", "message": None, "data": {"items": items}}
+        self._body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self._etag = f'"{hashlib.sha256(self._body).hexdigest()[:32]}"'
+
+    def issue_token(self, ttl: int | None = None) -> str:
+        header = _b64url(b'{"alg":"HS256","typ":"JWT"}')
+        exp = int(time.time()) + (self.options.token_ttl if ttl is None else ttl)
+        claims = {"username": self.options.username, "exp": exp}
+        payload = _b64url(json.dumps(claims).encode("utf-8"))
+        signature = hmac.new(
+            self._secret, f"{header}.{payload}".encode("ascii"), hashlib.sha256
+        ).digest()
+        return f"{header}.{payload}.{_b64url(signature)}"
+
+    def _is_valid_token(self, token: str) -> bool:
+        parts = token.split(".")
+        if len(parts) != 3:
+            return False
+        expected = hmac.new(
+            self._secret, f"{parts[0]}.{parts[1]}".encode("ascii"), hashlib.sha256
+        ).digest()
+        if not hmac.compare_digest(_b64url(expected), parts[2]):
+            return False
+        padded = parts[1] + "=" * (-len(parts[1]) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(padded))
+        return int(claims.get("exp", 0)) > time.time()
+
+    async def _delay(self) -> None:
+        if self.options.latency_ms > 0:
+            await asyncio.sleep(self.options.latency_ms / 1000)
+
+    def _roll(self, rate: float) -> bool:
+        return rate > 0 and self._rng.random() < rate
+
+    async def handle_login(self, request: web.Request) -> web.Response:
+        self.counters.logins += 1
+        await self._delay()
+        try:
+            body = await request.json()
+        except json.JSONDecodeError:
+            return web.json_response({"status": "error", "message": "请求格式错误"})
+        expected = hashlib.md5(self.options.password.encode("utf-8")).hexdigest()
+        if (
+            body.get("username") != self.options.username
+            or body.get("password") != expected
+        ):
+            return web.json_response(
+                {"status": "error", "message": "用户名或密码错误", "data": None}
+            )
+        return web.json_response(
+            {
+                "status": "ok",
+                "message": None,
+                "data": {"token": self.issue_token(), "username": body["username"]},
+            }
+        )
+
+    async def handle_commands(self, request: web.Request) -> web.StreamResponse:
+        self.counters.commands += 1
+        await self._delay()
+        auth = request.headers.get("Authorization", "")
+        token = auth.removeprefix("Bearer ").strip()
+        if not self._is_valid_token(token) or self._roll(
+            self.options.unauthorized_rate
+        ):
+            if self._is_valid_token(token):
+                self.counters.injected["401"] += 1
+            return web.json_response(
+                {"status": "error", "message": "Unauthorized"}, status=401
+            )
+        if self._roll(self.options.server_error_rate):
+            self.counters.injected["5xx"] += 1
+            return web.Response(status=503, text="dashboard restarting")
+        if self._roll(self.options.malformed_rate):
+            self.counters.injected["malformed"] += 1
+            return web.Response(
+                body=self._body[: len(self._body) // 2],
+                content_type="application/json",
+            )
+
+        headers = {}
+        if self.options.etag:
+            headers["ETag"] = self._etag
+            if request.headers.get("If-None-Match") == self._etag:
+                self.counters.not_modified += 1
+                return web.Response(status=304, headers=headers)
+        response = web.Response(
+            body=self._body, content_type="application/json", headers=headers
+        )
+        if "gzip" in request.headers.get("Accept-Encoding", ""):
+            response.enable_compression()
+        return response
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/api/auth/login", self.handle_login)
+        app.router.add_get("/api/commands", self.handle_commands)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving in the current loop and return the base URL."""
+        self._runner = web.AppRunner(self.build_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = self._runner.addresses[0][1]
+        self.base_url = f"http://{host}:{bound_port}"
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6185)
+    parser.add_argument("--commands", type=int, default=100)
+    parser.add_argument("--plugins", type=int, default=20)
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--unauthorized-rate", type=float, default=0.0)
+    parser.add_argument("--server-error-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--token-ttl", type=int, default=3600)
+    parser.add_argument("--etag", action="store_true")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    stub = DashboardStub(
+        StubOptions(
+            commands=args.commands,
+            plugins=args.plugins,
+            fanout=args.fanout,
+            depth=args.depth,
+            latency_ms=args.latency_ms,
+            unauthorized_rate=args.unauthorized_rate,
+            server_error_rate=args.server_error_rate,
+            malformed_rate=args.malformed_rate,
+            token_ttl=args.token_ttl,
+            etag=args.etag,
+        )
+    )
+    print(
+        f"Dashboard stub on http://{args.host}:{args.port} "
+        f"(user={stub.options.username}, password={stub.options.password})"
+    )
+    web.run_app(stub.build_app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
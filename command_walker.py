@@ -0,0 +1,153 @@
+"""Shared walker for dashboard command trees.
+
+``/api/commands`` returns command groups whose ``sub_commands`` nest
+arbitrarily deep. The walker below visits them with an explicit stack (no
+recursion limit), normalizes text with precompiled patterns and deduplicates
+on ``(plugin_name, command)`` tuples, producing the (public, admin) tiers in a
+single pass.
+"""
+
+from __future__ import annotations
+
+import re
+
+from .page_builder import CommandDocItem
+
+EXCLUDED_PLUGINS = frozenset({"builtin_commands"})
+TEXT_MAX_LENGTH = 120
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_PUBLIC_PERMISSIONS = frozenset({"", "everyone", "member"})
+_COMMAND_TYPES = frozenset({"command", "sub_command"})
+
+
+def normalize_whitespace(value: str) -> str:
+    """Strip and collapse runs of whitespace into single spaces."""
+    return _WHITESPACE_RE.sub(" ", value.strip())
+
+
+def clean_text(value: object, default: str) -> str:
+    """Normalize whitespace, fall back to ``default`` and cap the length."""
+    if not value:
+        return default
+    text = normalize_whitespace(value if isinstance(value, str) else str(value))
+    if not text:
+        return default
+    if len(text) > TEXT_MAX_LENGTH:
+        return f"{text[: TEXT_MAX_LENGTH - 3]}..."
+    return text
+
+
+def can_show_command(permission: str, include_admin_commands: bool = False) -> bool:
+    """Check if a command with ``permission`` is visible in the given tier."""
+    normalized = (permission or "everyone").strip().lower()
+    if normalized in _PUBLIC_PERMISSIONS:
+        return True
+    return include_admin_commands and normalized == "admin"
+
+
+def _sort_key(item: CommandDocItem) -> tuple[str, str]:
+    return item.plugin_name.lower(), item.command.lower()
+
+
+class CommandTierCollector:
+    """Accumulate raw command items into (public, admin) tiers.
+
+    Items can be fed one top-level node at a time, which lets the streaming
+    parser hand over nodes as soon as they are decoded.
+    """
+
+    __slots__ = (
+        "_admin_dedup",
+        "_admin_items",
+        "_public_dedup",
+        "_public_items",
+        "raw_count",
+    )
+
+    def __init__(self) -> None:
+        self._public_items: list[CommandDocItem] = []
+        self._admin_items: list[CommandDocItem] = []
+        self._public_dedup: set[tuple[str, str]] = set()
+        self._admin_dedup: set[tuple[str, str]] = set()
+        self.raw_count = 0
+
+    def add(self, item: object) -> None:
+        """Add one top-level raw item together with all of its sub commands."""
+        self.raw_count += 1
+        stack = [item]
+        pop = stack.pop
+        extend = stack.extend
+        while stack:
+            node = pop()
+            if not isinstance(node, dict):
+                continue
+
+            plugin_id = node.get("plugin")
+            if plugin_id and str(plugin_id).strip() in EXCLUDED_PLUGINS:
+                continue
+
+            if node.get("type", "") in _COMMAND_TYPES and node.get("enabled", False):
+                permission = str(node.get("permission") or "").strip().lower()
+                if permission in _PUBLIC_PERMISSIONS or permission == "admin":
+                    command = clean_text(node.get("effective_command"), "")
+                    if command:
+                        self._collect(node, command, permission)
+
+            sub_commands = node.get("sub_commands")
+            if sub_commands and isinstance(sub_commands, list):
+                # Reversed so that nodes are visited in document order.
+                extend(reversed(sub_commands))
+
+    def _collect(self, node: dict, command: str, permission: str) -> None:
+        plugin_name = clean_text(node.get("plugin_display_name"), "") or clean_text(
+            node.get("plugin"), "未知插件"
+        )
+        dedup_key = (plugin_name, command)
+        need_admin = dedup_key not in self._admin_dedup
+        need_public = (
+            permission in _PUBLIC_PERMISSIONS and dedup_key not in self._public_dedup
+        )
+        if not need_admin and not need_public:
+            return
+
+        raw_aliases = node.get("aliases")
+        aliases: list[str] = []
+        if raw_aliases and isinstance(raw_aliases, list):
+            for alias in raw_aliases:
+                if isinstance(alias, str):
+                    alias_text = clean_text(alias, "")
+                    if alias_text:
+                        aliases.append(alias_text)
+        doc_item = CommandDocItem(
+            plugin_name=plugin_name,
+            command=command,
+            description=clean_text(node.get("description"), "暂无说明。"),
+            aliases=aliases,
+            permission=permission or "everyone",
+        )
+        if need_admin:
+            self._admin_dedup.add(dedup_key)
+            self._admin_items.append(doc_item)
+        if need_public:
+            self._public_dedup.add(dedup_key)
+            self._public_items.append(doc_item)
+
+    def finish(self) -> tuple[list[CommandDocItem], list[CommandDocItem]]:
+        """Sort and return the collected (public, admin) tiers.
+
+        Both lists share the same ``CommandDocItem`` objects.
+        """
+        self._public_items.sort(key=_sort_key)
+        self._admin_items.sort(key=_sort_key)
+        return self._public_items, self._admin_items
+
+
+def extract_command_tiers(
+    raw_items: list,
+) -> tuple[list[CommandDocItem], list[CommandDocItem]]:
+    """Walk raw API items once and split them into (public, admin) tiers."""
+    collector = CommandTierCollector()
+    for item in raw_items:
+        collector.add(item)
+    return collector.finish()
@@ -0,0 +1,271 @@
+"""Aggregate command lists from several AstrBot dashboards.
+
+The primary dashboard comes from ``ASTRHost``/``admin_name``/``admin_password``;
+additional ones are configured in ``extra_dashboards`` as ``地址|用户名|密码``
+entries. Each endpoint gets its own ``ApiClient`` (token state, retry policy and
+circuit breaker), all endpoints are fetched concurrently, and the results are
+merged into one (public, admin) tier pair.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+from urllib.parse import urlsplit
+
+from astrbot.api import AstrBotConfig, logger
+
+from .api_client import ApiClient, CircuitBreaker
+from .page_builder import CommandDocItem
+
+if TYPE_CHECKING:
+    from .http_session import HttpSessionManager
+
+DEFAULT_HOST_TIMEOUT_SECONDS = 30.0
+
+
+@dataclass(slots=True)
+class DashboardEndpoint:
+    """One dashboard participating in the aggregated help menu."""
+
+    label: str
+    client: ApiClient
+
+
+@dataclass(slots=True)
+class DashboardFailure:
+    label: str
+    error: BaseException
+
+
+def parse_extra_dashboard(entry: object) -> tuple[str, str, str] | None:
+    """Parse an ``地址|用户名|密码`` entry; the password may contain ``|``."""
+    if not isinstance(entry, str):
+        return None
+    parts = [part.strip() for part in entry.split("|", 2)]
+    if not parts[0]:
+        return None
+    while len(parts) < 3:
+        parts.append("")
+    return parts[0], parts[1], parts[2]
+
+
+def endpoint_label(base_url: str) -> str:
+    """Short label for an endpoint, e.g. ``bot-a:6185``."""
+    parsed = urlsplit(base_url if "://" in base_url else f"http://{base_url}")
+    return parsed.netloc or base_url
+
+
+class DashboardPool:
+    """Fan out command fetches to every configured dashboard.
+
+    Exposes the subset of the ``ApiClient`` interface used by the plugin, so a
+    single-dashboard setup behaves exactly as before: items are not tagged
+    with a source and the sole host's error is raised unchanged.
+    """
+
+    def __init__(
+        self,
+        config: AstrBotConfig,
+        log_callback: Callable[[str], None] | None = None,
+        log_debug_callback: Callable[[str], None] | None = None,
+        session_manager: HttpSessionManager | None = None,
+    ):
+        self.config = config
+        self._log = log_callback or (lambda msg: logger.info(f"[helpmenu] {msg}"))
+        self._log_debug = log_debug_callback or (lambda msg: None)
+        self.last_fetch_unchanged = False
+        self.last_failures: list[DashboardFailure] = []
+        self._last_fetch_complete = False
+
+        def make_client(client_config) -> ApiClient:
+            return ApiClient(
+                client_config,
+                log_callback=self._log,
+                log_debug_callback=self._log_debug,
+                session_manager=session_manager,
+            )
+
+        primary = make_client(config)
+        self.endpoints: list[DashboardEndpoint] = [
+            DashboardEndpoint(endpoint_label(primary._get_base_url()), primary)
+        ]
+        seen_labels = {self.endpoints[0].label}
+        for entry in config.get("extra_dashboards") or []:
+            if isinstance(entry, str) and not entry.strip():
+                continue
+            parsed = parse_extra_dashboard(entry)
+            if parsed is None:
+                logger.warning(
+                    f"[helpmenu] 忽略无法解析的 extra_dashboards 项：{entry!r}"
+                )
+                continue
+            base_url, admin_name, admin_password = parsed
+            label = endpoint_label(base_url)
+            if label in seen_labels:
+                logger.warning(f"[helpmenu] extra_dashboards 中存在重复地址：{label}")
+                continue
+            seen_labels.add(label)
+            client = make_client(
+                {
+                    "ASTRHost": base_url,
+                    "admin_name": admin_name,
+                    "admin_password": admin_password,
+                    "api_token_auto_renew": config.get("api_token_auto_renew", False),
+                }
+            )
+            self.endpoints.append(DashboardEndpoint(label, client))
+
+    @property
+    def is_aggregated(self) -> bool:
+        return len(self.endpoints) > 1
+
+    def _host_timeout(self) -> float | None:
+        try:
+            timeout = float(
+                self.config.get("api_host_timeout", DEFAULT_HOST_TIMEOUT_SECONDS)
+            )
+        except (TypeError, ValueError):
+            timeout = DEFAULT_HOST_TIMEOUT_SECONDS
+        return timeout if timeout > 0 else None
+
+    def has_credentials(self) -> bool:
+        return any(endpoint.client.has_credentials() for endpoint in self.endpoints)
+
+    def clear_cached_credentials(self) -> None:
+        for endpoint in self.endpoints:
+            endpoint.client.clear_cached_credentials()
+
+    def describe_circuit_state(self) -> str:
+        """Describe endpoints whose circuit is not fully healthy ("" if none)."""
+        states = []
+        for endpoint in self.endpoints:
+            breaker = endpoint.client.circuit_breaker
+            if (
+                breaker.state == CircuitBreaker.CLOSED
+                and not breaker.consecutive_failures
+            ):
+                continue
+            state = endpoint.client.describe_circuit_state()
+            states.append(f"{endpoint.label} {state}" if self.is_aggregated else state)
+        return "；".join(states)
+
+    async def _fetch_endpoint(
+        self, endpoint: DashboardEndpoint
+    ) -> tuple[list[CommandDocItem], list[CommandDocItem]]:
+        timeout = self._host_timeout()
+        if timeout is None or not self.is_aggregated:
+            return await endpoint.client.fetch_command_tiers()
+        return await asyncio.wait_for(endpoint.client.fetch_command_tiers(), timeout)
+
+    async def fetch_command_tiers(
+        self,
+    ) -> tuple[list[CommandDocItem], list[CommandDocItem]]:
+        """Fetch every dashboard concurrently and merge the tiers.
+
+        Failed or timed-out hosts are skipped and recorded in
+        ``last_failures``; the first host's error is raised only when no
+        dashboard returned a result.
+        """
+        endpoints = [
+            endpoint for endpoint in self.endpoints if endpoint.client.has_credentials()
+        ]
+        results = await asyncio.gather(
+            *(self._fetch_endpoint(endpoint) for endpoint in endpoints),
+            return_exceptions=True,
+        )
+
+        succeeded: list[
+            tuple[DashboardEndpoint, tuple[list[CommandDocItem], list[CommandDocItem]]]
+        ] = []
+        self.last_failures = []
+        for endpoint, result in zip(endpoints, results):
+            if isinstance(result, BaseException):
+                if isinstance(result, asyncio.CancelledError):
+                    raise result
+                self.last_failures.append(DashboardFailure(endpoint.label, result))
+                logger.warning(
+                    f"[helpmenu] 拉取 Dashboard {endpoint.label} 的命令失败："
+                    f"{type(result).__name__}: {result}"
+                )
+                continue
+            succeeded.append((endpoint, result))
+
+        if not succeeded:
+            if self.last_failures:
+                raise self.last_failures[0].error
+            raise ValueError("没有配置可用账号密码的 Dashboard。")
+
+        # A merge that skipped a failed host differs from one that did not,
+        # even if every host that answered now reports "unchanged".
+        self.last_fetch_unchanged = (
+            self._last_fetch_complete
+            and not self.last_failures
+            and all(endpoint.client.last_fetch_unchanged for endpoint, _ in succeeded)
+        )
+        self._last_fetch_complete = not self.last_failures
+        if not self.is_aggregated:
+            return succeeded[0][1]
+        return self._merge_tiers(succeeded)
+
+    def _merge_tiers(
+        self,
+        results: list[
+            tuple[DashboardEndpoint, tuple[list[CommandDocItem], list[CommandDocItem]]]
+        ],
+    ) -> tuple[list[CommandDocItem], list[CommandDocItem]]:
+        """Merge per-host tiers, tagging each command with the hosts serving it.
+
+        Each tier is merged on its own ``(plugin, command)`` key, so a command
+        that one host exposes publicly stays in the public menu even if
+        another host lists it as admin-only. In the admin tier such a command
+        takes its fields from the public entry.
+        """
+        public_merged = self._merge_tier(
+            [(endpoint.label, tiers[0]) for endpoint, tiers in results]
+        )
+        admin_merged = self._merge_tier(
+            [(endpoint.label, tiers[1]) for endpoint, tiers in results],
+            preferred=public_merged,
+        )
+
+        def sort_key(item: CommandDocItem) -> tuple[str, str]:
+            return item.plugin_name.lower(), item.command.lower()
+
+        return (
+            sorted(public_merged.values(), key=sort_key),
+            sorted(admin_merged.values(), key=sort_key),
+        )
+
+    @staticmethod
+    def _merge_tier(
+        tier_results: list[tuple[str, list[CommandDocItem]]],
+        preferred: dict[tuple[str, str], CommandDocItem] | None = None,
+    ) -> dict[tuple[str, str], CommandDocItem]:
+        merged: dict[tuple[str, str], CommandDocItem] = {}
+        for label, items in tier_results:
+            for item in items:
+                key = (item.plugin_name, item.command)
+                existing = merged.get(key)
+                if existing is None:
+                    base = item
+                    if preferred is not None:
+                        base = preferred.get(key, item)
+                    # Copy: the client's cached tiers are reused on 304.
+                    merged[key] = CommandDocItem(
+                        plugin_name=base.plugin_name,
+                        command=base.command,
+                        description=base.description,
+                        aliases=list(base.aliases),
+                        permission=base.permission,
+                        source=label,
+                    )
+                elif label not in existing.source.split(", "):
+                    existing.source = f"{existing.source}, {label}"
+        return merged
+
+    async def close(self) -> None:
+        for endpoint in self.endpoints:
+            await endpoint.client.close()
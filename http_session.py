@@ -0,0 +1,106 @@
+"""Plugin-wide aiohttp session management.
+
+All network I/O of the plugin (dashboard API, remote image download, fallback
+t2i rendering) shares one tuned ``TCPConnector`` so that TCP/TLS connections,
+keep-alive slots and DNS lookups are reused across calls.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import importlib.util
+import ssl
+
+import aiohttp
+
+# Per call-site timeout profiles (seconds).
+TIMEOUT_PROFILES: dict[str, dict[str, float]] = {
+    "login": {"total": 12, "connect": 5},
+    "commands": {"total": 18, "connect": 5},
+    "image_download": {"total": 20, "connect": 5},
+    "fallback_render": {"total": 60, "connect": 10},
+}
+
+
+def _build_ssl_context() -> ssl.SSLContext:
+    """Trust the system store plus the certifi bundle when available.
+
+    Mirrors AstrBot's own ``http_ssl`` helper: dashboards signed by a private
+    CA installed system-wide keep working, and certifi only adds to the store.
+    """
+    context = ssl.create_default_context()
+    if importlib.util.find_spec("certifi") is not None:
+        certifi = importlib.import_module("certifi")
+        context.load_verify_locations(cafile=certifi.where())
+    return context
+
+
+class HttpSessionManager:
+    """Lazily open and share aiohttp sessions backed by one connector.
+
+    Sessions are keyed by ``trust_env`` because the dashboard is accessed
+    directly while the fallback t2i service honours proxy environment
+    variables; both share the same connection pool and DNS cache.
+    """
+
+    def __init__(
+        self,
+        limit: int = 32,
+        limit_per_host: int = 8,
+        keepalive_timeout: float = 30.0,
+        dns_cache_ttl: int = 300,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self._connector: aiohttp.TCPConnector | None = None
+        self._sessions: dict[bool, aiohttp.ClientSession] = {}
+        self._lock = asyncio.Lock()
+
+    def _get_connector(self) -> aiohttp.TCPConnector:
+        if self._connector is None or self._connector.closed:
+            self._connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_cache_ttl,
+                ssl=_build_ssl_context(),
+            )
+        return self._connector
+
+    async def get_session(self, trust_env: bool = False) -> aiohttp.ClientSession:
+        """Return the shared session, opening it on first use."""
+        session = self._sessions.get(trust_env)
+        if session is not None and not session.closed:
+            return session
+
+        async with self._lock:
+            session = self._sessions.get(trust_env)
+            if session is not None and not session.closed:
+                return session
+            session = aiohttp.ClientSession(
+                connector=self._get_connector(),
+                connector_owner=False,
+                trust_env=trust_env,
+            )
+            self._sessions[trust_env] = session
+            return session
+
+    def timeout(self, profile: str) -> aiohttp.ClientTimeout:
+        """Return the ``ClientTimeout`` configured for a call site."""
+        return aiohttp.ClientTimeout(**TIMEOUT_PROFILES[profile])
+
+    async def close(self) -> None:
+        """Close all sessions and the shared connector."""
+        async with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+            for session in sessions:
+                if not session.closed:
+                    await session.close()
+            if self._connector is not None and not self._connector.closed:
+                await self._connector.close()
+            self._connector = None
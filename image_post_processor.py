@@ -5,12 +5,16 @@ import importlib
 import importlib.util
 import tempfile
 from pathlib import Path
+from typing import TYPE_CHECKING
 from urllib.parse import urlparse
 
 import aiohttp
 
 from astrbot.api import logger
 
+if TYPE_CHECKING:
+    from .http_session import HttpSessionManager
+
 
 def _resolve_local_path(image_ref: str) -> Path | None:
     if not image_ref:
@@ -30,17 +34,24 @@ def _is_near_white(r: int, g: int, b: int, threshold: int) -> bool:
     return r >= threshold and g >= threshold and b >= threshold
 
 
-async def _download_remote_image(image_ref: str) -> Path | None:
+async def _download_remote_image(
+    image_ref: str, session_manager: HttpSessionManager | None = None
+) -> Path | None:
     parsed = urlparse(image_ref)
     if parsed.scheme not in {"http", "https"}:
         return None
 
-    timeout = aiohttp.ClientTimeout(total=20)
+    owned_session: aiohttp.ClientSession | None = None
     try:
-        async with aiohttp.ClientSession(timeout=timeout, trust_env=False) as session:
-            async with session.get(image_ref) as response:
-                response.raise_for_status()
-                content = await response.read()
+        if session_manager is not None:
+            session = await session_manager.get_session()
+            timeout = session_manager.timeout("image_download")
+        else:
+            session = owned_session = aiohttp.ClientSession(trust_env=False)
+            timeout = aiohttp.ClientTimeout(total=20)
+        async with session.get(image_ref, timeout=timeout) as response:
+            response.raise_for_status()
+            content = await response.read()
     except Exception as exc:  # noqa: BLE001
         logger.warning(
             "[helpmenu] Failed to download remote image for post-process: %s: %s",
@@ -48,6 +59,9 @@ async def _download_remote_image(image_ref: str) -> Path | None:
             exc,
         )
         return None
+    finally:
+        if owned_session is not None:
+            await owned_session.close()
 
     ext = Path(parsed.path).suffix or ".png"
     digest = hashlib.sha256(image_ref.encode("utf-8")).hexdigest()[:16]
@@ -67,11 +81,15 @@ async def _download_remote_image(image_ref: str) -> Path | None:
 
 
 async def crop_outer_white_background(
-    image_ref: str, threshold: int = 248, alpha_threshold: int = 12
+    image_ref: str,
+    threshold: int = 248,
+    alpha_threshold: int = 12,
+    session_manager: HttpSessionManager | None = None,
 ) -> str:
     """Crop transparent/near-white border area from a rendered help image.
 
     Returns the original image reference when post-processing is not possible.
+    Remote images are downloaded through ``session_manager`` when given.
     """
 
     if importlib.util.find_spec("PIL") is None:
@@ -81,7 +99,9 @@ async def crop_outer_white_background(
     image_path = _resolve_local_path(image_ref)
     result_ref = image_ref
     if image_path is None:
-        downloaded_path = await _download_remote_image(image_ref)
+        downloaded_path = await _download_remote_image(
+            image_ref, session_manager=session_manager
+        )
         if downloaded_path is None:
             return result_ref
         image_path = downloaded_path
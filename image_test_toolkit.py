@@ -5,12 +5,15 @@ from __future__ import annotations
 import asyncio
 import json
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import aiohttp
 
 from astrbot.core.utils.http_ssl import build_tls_connector
 
+if TYPE_CHECKING:
+    from .http_session import HttpSessionManager
+
 FALLBACK_T2I_ENDPOINT = "https://t2i.soulter.top/text2img"
 DEFAULT_RENDER_OPTIONS = {
     "type": "png",
@@ -239,8 +242,13 @@ async def render_with_fallback_t2i(
     template_content: str,
     tmpl_data: dict[str, Any],
     log_debug_callback=None,
+    session_manager: HttpSessionManager | None = None,
 ) -> tuple[str, str]:
-    """Render image by the online fallback t2i service."""
+    """Render image by the online fallback t2i service.
+
+    Uses the plugin-wide ``session_manager`` when given, otherwise a
+    throwaway session (standalone toolkit usage).
+    """
 
     def _log(msg: str) -> None:
         if log_debug_callback:
@@ -263,27 +271,52 @@ async def render_with_fallback_t2i(
         f"Fallback request payload size: {len(json.dumps(post_data, ensure_ascii=False))}"
     )
 
+    headers = {"Accept-Encoding": "gzip, deflate"}
+    if session_manager is not None:
+        session = await session_manager.get_session(trust_env=True)
+        return await _post_fallback_t2i(
+            session,
+            post_data,
+            headers,
+            session_manager.timeout("fallback_render"),
+            _log,
+        )
+
     async with aiohttp.ClientSession(
         trust_env=True,
         connector=build_tls_connector(),
-        headers={"Accept-Encoding": "gzip, deflate"},
+        headers=headers,
     ) as session:
-        async with session.post(
-            f"{FALLBACK_T2I_ENDPOINT}/generate", json=post_data
-        ) as resp:
-            _log(f"Fallback response status: {resp.status}")
-            if resp.status != 200:
-                text = await resp.text()
-                raise RuntimeError(
-                    f"Fallback service error (HTTP {resp.status}): {text[:200]}"
-                )
+        return await _post_fallback_t2i(session, post_data, headers, None, _log)
 
-            data = await resp.json()
-            if "data" not in data or "id" not in data["data"]:
-                raise RuntimeError("No image ID found in fallback response")
 
-            image_url = f"{FALLBACK_T2I_ENDPOINT}/{data['data']['id']}"
-            return image_url, "系统文转图失败，已切换到备用文转图服务生成图片"
+async def _post_fallback_t2i(
+    session: aiohttp.ClientSession,
+    post_data: dict[str, Any],
+    headers: dict[str, str],
+    timeout: aiohttp.ClientTimeout | None,
+    log,
+) -> tuple[str, str]:
+    """POST the render request to the fallback t2i service and build the URL."""
+    request_kwargs: dict[str, Any] = {"json": post_data, "headers": headers}
+    if timeout is not None:
+        request_kwargs["timeout"] = timeout
+    async with session.post(
+        f"{FALLBACK_T2I_ENDPOINT}/generate", **request_kwargs
+    ) as resp:
+        log(f"Fallback response status: {resp.status}")
+        if resp.status != 200:
+            text = await resp.text()
+            raise RuntimeError(
+                f"Fallback service error (HTTP {resp.status}): {text[:200]}"
+            )
+
+        data = await resp.json()
+        if "data" not in data or "id" not in data["data"]:
+            raise RuntimeError("No image ID found in fallback response")
+
+        image_url = f"{FALLBACK_T2I_ENDPOINT}/{data['data']['id']}"
+        return image_url, "系统文转图失败，已切换到备用文转图服务生成图片"
 
 
 async def run_image_test_command(
@@ -292,6 +325,7 @@ async def run_image_test_command(
     config,
     is_debug_enabled: bool,
     log_debug_callback=None,
+    session_manager: HttpSessionManager | None = None,
 ) -> tuple[str, str]:
     """Execute the imageTest flow used by /helpMenu imageTest."""
 
@@ -363,7 +397,7 @@ async def run_image_test_command(
     except Exception as primary_exc:  # noqa: BLE001
         _log(f"System renderer failed: {type(primary_exc).__name__}: {primary_exc}")
         return await render_with_fallback_t2i(
-            template_content, render_data, log_debug_callback
+            template_content, render_data, log_debug_callback, session_manager
         )
 
 
@@ -1,40 +1,54 @@
 import asyncio
 import hashlib
 import json
-import re
-from collections import OrderedDict, defaultdict
-from dataclasses import dataclass
+import os
+import random
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable, Coroutine
 from datetime import datetime
 from pathlib import Path
+from typing import Any
 
 from astrbot.api import AstrBotConfig, logger
 from astrbot.api.event import AstrMessageEvent, filter
-from astrbot.api.star import Context, Star, register
+from astrbot.api.star import Context, Star, StarTools, register
 from astrbot.core.star.filter.command import CommandFilter
 from astrbot.core.star.filter.command_group import CommandGroupFilter
 from astrbot.core.star.filter.permission import PermissionType, PermissionTypeFilter
 from astrbot.core.star.star_handler import star_handlers_registry
 
-from .api_client import ApiClient, HttpStatusError
+from .api_client import CircuitOpenError, HttpStatusError
+from .command_walker import EXCLUDED_PLUGINS, can_show_command, normalize_whitespace
+from .dashboard_pool import DashboardPool, parse_extra_dashboard
+from .http_session import HttpSessionManager
 from .image_post_processor import crop_outer_white_background
 from .image_renderer import render_help_page_as_image
-from .page_builder import CommandDocItem, build_image_pages, build_pages
-
-
-@dataclass(slots=True, frozen=True)
-class HelpCacheSnapshot:
-    pages: tuple[str, ...]
-    image_pages: tuple[tuple[dict[str, object], ...], ...]
-    total_items: int
-    last_update: str
-    source_mode: str
+from .page_builder import CommandDocItem, PageIndex
+from .session_store import SessionPageDatabase, SessionPosition, ShardedSessionStore
+from .snapshot_builder import (
+    HelpCacheSnapshot,
+    HelpCacheVersion,
+    build_help_snapshots,
+    dump_help_cache,
+    load_help_cache,
+    split_permission_tiers,
+)
 
 
 @register("helpmenu", "Sagiri777", "自动生成可翻页的指令帮助菜单", "1.0.16")
 class MyPlugin(Star):
     _SESSION_PAGE_CACHE_MAX_SIZE = 1024
+    _SESSION_PAGE_TTL_HOURS = 168.0
+    _AUTO_REFRESH_QUIET_SECONDS = 1.0
+    _AUTO_REFRESH_MAX_DELAY_SECONDS = 10.0
+    _PERIODIC_REFRESH_JITTER_SECONDS = 30.0
+    _STARTUP_WAIT_SECONDS = 3.0
+    _READINESS_BUILDING = "building"
+    _READINESS_READY = "ready"
+    _READINESS_FAILED = "failed"
     _MAX_SESSION_KEY_LEN = 128
-    _EXCLUDED_PLUGINS = {"builtin_commands"}
+    _EXCLUDED_PLUGINS = EXCLUDED_PLUGINS
     _MODE_METADATA = "metadata"
     _MODE_API = "api"
     _OUTPUT_TEXT = "text"
@@ -51,26 +65,67 @@ class MyPlugin(Star):
     def __init__(self, context: Context, config: AstrBotConfig):
         super().__init__(context)
         self.config = config
-        self._refresh_lock = asyncio.Lock()
-        self._session_page_lock = asyncio.Lock()
-        self._help_cache = HelpCacheSnapshot(
+        self._refresh_task: asyncio.Task[tuple[bool, str]] | None = None
+        self._refresh_followup: asyncio.Task[tuple[bool, str]] | None = None
+        empty_snapshot = HelpCacheSnapshot(
             pages=(),
             image_pages=(),
             total_items=0,
             last_update="从未",
             source_mode=self._MODE_METADATA,
         )
-        self._help_cache_admin_private = HelpCacheSnapshot(
-            pages=(),
-            image_pages=(),
-            total_items=0,
-            last_update="从未",
-            source_mode=self._MODE_METADATA,
+        # 读取方只需取一次该引用，即可拿到彼此一致的两个层级快照。
+        self._help_cache = HelpCacheVersion(
+            version=0,
+            fingerprint="",
+            public=empty_snapshot,
+            admin_private=empty_snapshot,
         )
-        self._session_page: OrderedDict[str, int] = OrderedDict()
-        self._api_client: ApiClient | None = None
+        # 最近一次 API 拉取到的命令是否已构建进当前缓存；构建失败时保持 False，
+        # 下次即使 Dashboard 返回未变化也会重新构建，避免一直提供过期菜单。
+        self._api_fetch_applied = False
+        # 缓存保留处理器对象本身并按身份比较：对象被回收后 id 可能被新对象复用，
+        # 不能只记 id。
+        self._metadata_module_cache: dict[
+            str, tuple[tuple[str, tuple[object, ...]], list[CommandDocItem]]
+        ] = {}
+        self._metadata_dirty_modules: set[str] = set()
+        self._metadata_merged_tiers: (
+            tuple[
+                tuple[str, ...],
+                tuple[list[CommandDocItem], list[CommandDocItem]],
+            ]
+            | None
+        ) = None
+        self._session_page = ShardedSessionStore(
+            max_size=self._get_session_page_cache_size(),
+            on_evict=self._log_session_eviction,
+            ttl_seconds=self._get_session_page_ttl_hours() * 3600,
+            resolver=self._remap_session_position,
+        )
+        self._api_client: DashboardPool | None = None
+        self._http_sessions = HttpSessionManager()
         self._plugin_change_pending = False
+        self._plugin_change_events = 0
+        self._plugin_change_first_at = 0.0
+        self._plugin_change_last_at = 0.0
+        # 去抖与定时刷新的计时、等待经由这两个入口，便于测试替换为虚拟时钟。
+        self._clock: Callable[[], float] = time.monotonic
+        self._sleep: Callable[[float], Awaitable[object]] = asyncio.sleep
         self._plugin_refresh_task: asyncio.Task | None = None
+        self._auto_refresh_count = 0
+        self._auto_refresh_coalesced_events = 0
+        self._auto_refresh_max_batch = 0
+        self._periodic_refresh_task: asyncio.Task | None = None
+        # 首次刷新在后台进行：building -> ready / failed。
+        self._readiness = self._READINESS_BUILDING
+        self._startup_refresh_task: asyncio.Task | None = None
+        self._page_renders: dict[
+            str, tuple[tuple[int, str, int, str], asyncio.Task[str]]
+        ] = {}
+        # 每个渲染任务上仍在等待结果的请求数；相同请求共享同一渲染任务。
+        self._page_render_waiters: dict[asyncio.Task[str], int] = {}
+        self._suppressed_renders = 0
 
     def _is_debug_enabled(self) -> bool:
         return bool(self.config.get("debug", False))
@@ -115,6 +170,116 @@ class MyPlugin(Star):
         self._log_debug(f"回退到默认输出模式: {self._OUTPUT_TEXT}")
         return self._OUTPUT_TEXT
 
+    def _get_session_page_cache_size(self) -> int:
+        try:
+            size = int(
+                self.config.get(
+                    "session_page_cache_size", self._SESSION_PAGE_CACHE_MAX_SIZE
+                )
+            )
+        except (TypeError, ValueError):
+            size = self._SESSION_PAGE_CACHE_MAX_SIZE
+        if size > 0:
+            return size
+        logger.warning(
+            f"[helpmenu] session_page_cache_size={size} 无效，将回退为 {self._SESSION_PAGE_CACHE_MAX_SIZE}。"
+        )
+        return self._SESSION_PAGE_CACHE_MAX_SIZE
+
+    def _get_session_page_ttl_hours(self) -> float:
+        try:
+            ttl_hours = float(
+                self.config.get("session_page_ttl_hours", self._SESSION_PAGE_TTL_HOURS)
+            )
+        except (TypeError, ValueError):
+            ttl_hours = self._SESSION_PAGE_TTL_HOURS
+        return max(0.0, ttl_hours)
+
+    def _describe_session_page_stats(self) -> str:
+        store = self._session_page
+        ttl_text = (
+            f"{store.ttl_seconds / 3600:g} 小时" if store.ttl_seconds > 0 else "不过期"
+        )
+        return (
+            f"\n会话页码缓存：{len(store)}/{store.max_size} 条，有效期 {ttl_text}，"
+            f"容量淘汰 {store.evictions} 次，过期淘汰 {store.expirations} 次；"
+            f"因连续翻页放弃的过期渲染 {self._suppressed_renders} 次。"
+        )
+
+    def _get_auto_refresh_window(self) -> tuple[float, float]:
+        """返回插件变更自动刷新的 (静默窗口秒数, 最长推迟秒数)。"""
+        values = []
+        for key, default in (
+            ("auto_refresh_quiet_seconds", self._AUTO_REFRESH_QUIET_SECONDS),
+            ("auto_refresh_max_delay_seconds", self._AUTO_REFRESH_MAX_DELAY_SECONDS),
+        ):
+            try:
+                value = float(self.config.get(key, default))
+            except (TypeError, ValueError):
+                value = default
+            values.append(max(0.0, value))
+        quiet_seconds, max_delay_seconds = values
+        return quiet_seconds, max(quiet_seconds, max_delay_seconds)
+
+    def _describe_auto_refresh_stats(self) -> str:
+        if not self._auto_refresh_count:
+            return ""
+        return (
+            f"\n插件变更自动刷新：共 {self._auto_refresh_count} 次，"
+            f"合并插件变更事件 {self._auto_refresh_coalesced_events} 个，"
+            f"单次最多合并 {self._auto_refresh_max_batch} 个。"
+        )
+
+    def _is_session_page_persist_enabled(self) -> bool:
+        return bool(self.config.get("persist_session_pages", False))
+
+    def _is_help_snapshot_persist_enabled(self) -> bool:
+        return bool(self.config.get("persist_help_snapshot", True))
+
+    def _get_help_snapshot_path(self) -> Path:
+        return Path(StarTools.get_data_dir("helpmenu")) / "help_snapshot.json"
+
+    async def _load_help_snapshot(self) -> None:
+        """载入上次保存的帮助快照，使 /helpMenu 在首次刷新完成前即可使用。"""
+        if not self._is_help_snapshot_persist_enabled():
+            return
+        try:
+            path = self._get_help_snapshot_path()
+            payload = await asyncio.to_thread(path.read_bytes)
+            cache = await asyncio.to_thread(load_help_cache, payload, 1)
+        except FileNotFoundError:
+            return
+        except Exception as exc:  # noqa: BLE001
+            logger.warning(
+                f"[helpmenu] 载入已保存的帮助菜单快照失败，将重新生成：{exc}"
+            )
+            return
+        if cache.public.source_mode != self._get_fetch_mode() or not cache.ready:
+            self._log_debug("已保存的帮助菜单快照与当前获取模式不符或为空，已忽略。")
+            return
+        self._help_cache = cache
+        self._readiness = self._READINESS_READY
+        self._log(
+            f"已载入上次保存的帮助菜单（更新于 {cache.public.last_update}），"
+            "将在后台校验是否需要更新。"
+        )
+
+    async def _save_help_snapshot(self, cache: HelpCacheVersion) -> None:
+        """把帮助快照写入数据目录（先写临时文件再替换，避免留下半个文件）。"""
+        if not self._is_help_snapshot_persist_enabled():
+            return
+
+        def write() -> None:
+            path = self._get_help_snapshot_path()
+            temp_path = path.with_name(f"{path.name}.tmp")
+            temp_path.write_bytes(dump_help_cache(cache))
+            os.replace(temp_path, path)
+
+        try:
+            await asyncio.to_thread(write)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning(f"[helpmenu] 保存帮助菜单快照失败：{exc}")
+
     def _is_image_post_process_enabled(self) -> bool:
         return bool(self.config.get("post_process_image", True))
 
@@ -138,19 +303,94 @@ class MyPlugin(Star):
             f"默认图片渲染选项: {json.dumps(self._DEFAULT_IMAGE_RENDER_OPTIONS, ensure_ascii=False)}"
         )
 
+        if self._is_session_page_persist_enabled():
+            try:
+                database_path = (
+                    Path(StarTools.get_data_dir("helpmenu")) / "session_pages.sqlite3"
+                )
+                self._session_page.enable_persistence(
+                    SessionPageDatabase(database_path)
+                )
+                self._log_debug(f"会话页码持久化已启用: {database_path}")
+            except Exception as exc:  # noqa: BLE001
+                logger.warning(f"[helpmenu] 启用会话页码持久化失败：{exc}")
+
         # Initialize API client if in API mode
         if self._get_fetch_mode() == self._MODE_API:
-            self._api_client = ApiClient(
+            self._api_client = DashboardPool(
                 self.config,
                 log_callback=self._log,
                 log_debug_callback=self._log_debug,
+                session_manager=self._http_sessions,
             )
 
+        # 有上次保存的快照时先直接提供服务，首次刷新只在指纹变化时替换它。
+        await self._load_help_snapshot()
+        # 首次刷新（API 模式下含登录与拉取）放到后台，不拖慢 AstrBot 启动。
+        self._startup_refresh_task = asyncio.create_task(self._run_startup_refresh())
+
+    async def _run_startup_refresh(self) -> None:
         ok, message = await self._refresh_help_cache(force=True)
         if ok:
             self._log(message)
         else:
             logger.warning(f"[helpmenu] {message}")
+        if self._help_cache.ready:
+            self._readiness = self._READINESS_READY
+        else:
+            self._readiness = self._READINESS_FAILED
+
+        interval_seconds, _ = self._get_periodic_refresh_schedule()
+        if interval_seconds > 0:
+            self._periodic_refresh_task = asyncio.create_task(
+                self._run_periodic_refresh()
+            )
+
+    def _get_periodic_refresh_schedule(self) -> tuple[float, float]:
+        """返回定时刷新的 (间隔秒数, 抖动秒数)；间隔为 0 表示未启用。"""
+        try:
+            interval_minutes = float(
+                self.config.get("periodic_refresh_minutes", 0) or 0
+            )
+        except (TypeError, ValueError):
+            interval_minutes = 0.0
+        try:
+            jitter_seconds = float(
+                self.config.get(
+                    "periodic_refresh_jitter_seconds",
+                    self._PERIODIC_REFRESH_JITTER_SECONDS,
+                )
+            )
+        except (TypeError, ValueError):
+            jitter_seconds = self._PERIODIC_REFRESH_JITTER_SECONDS
+        interval_seconds = max(0.0, interval_minutes * 60)
+        return interval_seconds, min(max(0.0, jitter_seconds), interval_seconds / 2)
+
+    async def _run_periodic_refresh(self) -> None:
+        # 多个实例或多个 Bot 同时启动时，抖动可以把对 Dashboard 的请求错开。
+        while True:
+            interval_seconds, jitter_seconds = self._get_periodic_refresh_schedule()
+            if interval_seconds <= 0:
+                return
+            await self._sleep(
+                interval_seconds + random.uniform(-jitter_seconds, jitter_seconds)
+            )
+            if (
+                self._get_fetch_mode() == self._MODE_API
+                and not self._has_api_credentials()
+            ):
+                self._log_debug("定时刷新已跳过：API 模式下无可用账号密码。")
+                continue
+
+            version = self._help_cache.version
+            # 正在进行的刷新足够新，直接共享其结果即可；无需 require_newer。
+            ok, message = await self._refresh_help_cache(force=True)
+            if not ok:
+                logger.warning(f"[helpmenu] 定时刷新帮助文档失败：{message}")
+            elif self._help_cache.version != version:
+                self._log(f"定时刷新检测到命令变化：{message}")
+            else:
+                self._log_debug("定时刷新：命令列表未变化。")
 
     def _clear_sensitive_config_if_needed(self) -> None:
         if not self._is_auto_clear_enabled():
@@ -160,94 +400,90 @@ class MyPlugin(Star):
         try:
             self.config["admin_name"] = ""
             self.config["admin_password"] = ""
+            extra_dashboards = self.config.get("extra_dashboards") or []
+            if extra_dashboards:
+                cleared_dashboards = []
+                for entry in extra_dashboards:
+                    parsed = parse_extra_dashboard(entry)
+                    cleared_dashboards.append(parsed[0] if parsed else entry)
+                self.config["extra_dashboards"] = cleared_dashboards
             self.config.save_config()
-            self._log("刷新成功，已清空配置中的 admin_name/admin_password。")
+            self._log("刷新成功，已清空配置中的 Dashboard 账号密码。")
         except Exception as exc:  # noqa: BLE001
             logger.warning(f"[helpmenu] 清空敏感配置失败：{exc}")
 
-    def _can_show_command(
-        self, permission: str, include_admin_commands: bool = False
-    ) -> bool:
-        normalized = (permission or "everyone").strip().lower()
-        if normalized in {"", "everyone", "member"}:
-            return True
-        if include_admin_commands and normalized == "admin":
-            return True
-        return False
-
-    def _extract_allowed_items(
-        self, raw_items: list[dict], include_admin_commands: bool = False
+    def _parse_module_handlers(
+        self, plugin_name: str, handlers: list
     ) -> list[CommandDocItem]:
-        collected: list[CommandDocItem] = []
-        dedup: set[str] = set()
-
-        def clean_text(value: str | None, default: str) -> str:
-            text = re.sub(r"\s+", " ", (value or "").strip())
-            if not text:
-                return default
-            if len(text) > 120:
-                return f"{text[:117]}..."
-            return text
-
-        def walk(items: list[dict]) -> None:
-            for item in items:
-                if not isinstance(item, dict):
+        """解析单个插件模块的处理器，返回带权限标记的候选命令。"""
+        candidates: list[CommandDocItem] = []
+        for handler in handlers:
+            handler_desc = getattr(handler, "desc", "")
+            event_filters = getattr(handler, "event_filters", [])
+            if not isinstance(event_filters, list):
+                continue
+
+            description = normalize_whitespace(str(handler_desc or "")) or "暂无说明。"
+            permission = "everyone"
+            for event_filter in event_filters:
+                if not isinstance(event_filter, PermissionTypeFilter):
                     continue
+                if event_filter.permission_type == PermissionType.ADMIN:
+                    permission = "admin"
+                else:
+                    permission = "member"
+                break
+
+            if not can_show_command(permission, include_admin_commands=True):
+                continue
 
-                plugin_id = str(item.get("plugin") or "").strip()
-                if plugin_id in self._EXCLUDED_PLUGINS:
+            for event_filter in event_filters:
+                command = ""
+                aliases: list[str] = []
+
+                if isinstance(event_filter, (CommandFilter, CommandGroupFilter)):
+                    full_names = [
+                        normalize_whitespace(name)
+                        for name in event_filter.get_complete_command_names()
+                        if isinstance(name, str) and name.strip()
+                    ]
+                    if full_names:
+                        command = full_names[0]
+                        aliases = full_names[1:]
+
+                if not command:
                     continue
 
-                item_type = item.get("type", "")
-                enabled = item.get("enabled", False)
-                permission = str(item.get("permission") or "").strip().lower()
-
-                if (
-                    item_type in {"command", "sub_command"}
-                    and enabled
-                    and self._can_show_command(permission, include_admin_commands)
-                ):
-                    command = clean_text(item.get("effective_command"), "")
-                    if command:
-                        plugin_name = clean_text(
-                            item.get("plugin_display_name"), ""
-                        ) or clean_text(item.get("plugin"), "未知插件")
-                        description = clean_text(item.get("description"), "暂无说明。")
-                        raw_aliases = item.get("aliases", [])
-                        aliases: list[str] = []
-                        if isinstance(raw_aliases, list):
-                            for alias in raw_aliases:
-                                if not isinstance(alias, str):
-                                    continue
-                                alias_text = clean_text(alias, "")
-                                if alias_text:
-                                    aliases.append(alias_text)
-                        dedup_key = f"{plugin_name}|{command}"
-                        if dedup_key not in dedup:
-                            dedup.add(dedup_key)
-                            collected.append(
-                                CommandDocItem(
-                                    plugin_name=plugin_name,
-                                    command=command,
-                                    description=description,
-                                    aliases=aliases,
-                                    permission=permission or "everyone",
-                                ),
-                            )
-
-                sub_commands = item.get("sub_commands", [])
-                if isinstance(sub_commands, list) and sub_commands:
-                    walk(sub_commands)
-
-        walk(raw_items)
-        collected.sort(key=lambda x: (x.plugin_name.lower(), x.command.lower()))
-        return collected
-
-    def _collect_items_from_metadata(
-        self, include_admin_commands: bool = False
-    ) -> list[CommandDocItem]:
-        collected: list[CommandDocItem] = []
-        dedup: set[str] = set()
+                candidates.append(
+                    CommandDocItem(
+                        plugin_name=plugin_name,
+                        command=command,
+                        description=description,
+                        aliases=aliases,
+                        permission=permission,
+                    )
+                )
+        return candidates
+
+    def _mark_metadata_module_dirty(self, module_path: str) -> None:
+        """标记某个插件模块需要在下次刷新时重新解析。"""
+        if module_path:
+            self._metadata_dirty_modules.add(module_path)
+
+    def _invalidate_metadata_cache(self) -> None:
+        """清空按模块缓存的元数据解析结果，下次刷新时全量解析。"""
+        self._metadata_module_cache.clear()
+        self._metadata_dirty_modules.clear()
+        self._metadata_merged_tiers = None
+
+    async def _collect_items_from_metadata(
+        self,
+    ) -> tuple[list[CommandDocItem], list[CommandDocItem]]:
+        """单次扫描插件元数据，返回 (普通, 管理员私聊) 两档命令列表。
+
+        每个插件模块的解析结果按 module_path 缓存；仅重新解析被标记为变更
+        或处理器集合发生变化的模块，其余模块直接复用缓存。
+        """
         # Type ignore: context is actually Context instance with get_all_stars method
         all_stars_metadata = [
             star
@@ -255,7 +491,8 @@ class MyPlugin(Star):
             if star.activated  # type: ignore[attr-defined]
         ]
         if not all_stars_metadata:
-            return collected
+            self._invalidate_metadata_cache()
+            return [], []
 
         handlers_by_module: defaultdict[str, list] = defaultdict(list)
         for handler in star_handlers_registry:
@@ -265,6 +502,10 @@ class MyPlugin(Star):
                 continue
             handlers_by_module[module_path].append(handler)
 
+        dirty_modules = self._metadata_dirty_modules
+        self._metadata_dirty_modules = set()
+        module_order: list[str] = []
+        reparsed_count = 0
         for star in all_stars_metadata:
             plugin_id = str(getattr(star, "name", "") or "").strip()
             module_path = str(getattr(star, "module_path", "") or "").strip()
@@ -276,212 +517,335 @@ class MyPlugin(Star):
                 or plugin_id
                 or "未知插件"
             )
-
-            for handler in handlers_by_module.get(module_path, []):
-                handler_desc = getattr(handler, "desc", "")
-                event_filters = getattr(handler, "event_filters", [])
-                if not isinstance(event_filters, list):
-                    continue
-
-                description = (
-                    re.sub(r"\s+", " ", str(handler_desc or "").strip()) or "暂无说明。"
+            module_handlers = tuple(handlers_by_module.get(module_path, ()))
+            module_order.append(module_path)
+
+            cached = self._metadata_module_cache.get(module_path)
+            if (
+                cached is not None
+                and module_path not in dirty_modules
+                and cached[0][0] == plugin_name
+                and len(cached[0][1]) == len(module_handlers)
+                and all(
+                    old is new
+                    for old, new in zip(cached[0][1], module_handlers, strict=True)
                 )
-                permission = "everyone"
-                for event_filter in event_filters:
-                    if not isinstance(event_filter, PermissionTypeFilter):
-                        continue
-                    if event_filter.permission_type == PermissionType.ADMIN:
-                        permission = "admin"
-                    else:
-                        permission = "member"
-                    break
-
-                if not self._can_show_command(permission, include_admin_commands):
-                    continue
+            ):
+                continue
+            self._metadata_module_cache[module_path] = (
+                (plugin_name, module_handlers),
+                self._parse_module_handlers(plugin_name, list(module_handlers)),
+            )
+            reparsed_count += 1
 
-                for event_filter in event_filters:
-                    command = ""
-                    aliases: list[str] = []
-
-                    if isinstance(event_filter, CommandFilter):
-                        full_names = [
-                            re.sub(r"\s+", " ", name.strip())
-                            for name in event_filter.get_complete_command_names()
-                            if isinstance(name, str) and name.strip()
-                        ]
-                        if full_names:
-                            command = full_names[0]
-                            aliases = full_names[1:]
-                    elif isinstance(event_filter, CommandGroupFilter):
-                        full_names = [
-                            re.sub(r"\s+", " ", name.strip())
-                            for name in event_filter.get_complete_command_names()
-                            if isinstance(name, str) and name.strip()
-                        ]
-                        if full_names:
-                            command = full_names[0]
-                            aliases = full_names[1:]
-
-                    if not command:
-                        continue
-
-                    dedup_key = f"{plugin_name}|{command}"
-                    if dedup_key in dedup:
-                        continue
-                    dedup.add(dedup_key)
-                    collected.append(
-                        CommandDocItem(
-                            plugin_name=plugin_name,
-                            command=command,
-                            description=description,
-                            aliases=aliases,
-                            permission=permission,
-                        )
-                    )
+        active_modules = set(module_order)
+        removed_modules = [
+            module_path
+            for module_path in self._metadata_module_cache
+            if module_path not in active_modules
+        ]
+        for module_path in removed_modules:
+            del self._metadata_module_cache[module_path]
+
+        merged_key = tuple(module_order)
+        if (
+            not reparsed_count
+            and not removed_modules
+            and self._metadata_merged_tiers is not None
+            and self._metadata_merged_tiers[0] == merged_key
+        ):
+            self._log_debug("插件元数据无变化，复用已合并的命令列表。")
+            return self._metadata_merged_tiers[1]
 
-        collected.sort(
-            key=lambda item: (item.plugin_name.lower(), item.command.lower())
+        self._log_debug(
+            f"元数据增量解析: 重新解析 {reparsed_count} 个模块，"
+            f"复用 {len(module_order) - reparsed_count} 个，移除 {len(removed_modules)} 个。"
         )
-        return collected
-
-    async def _fetch_commands_from_api(
-        self, include_admin_commands: bool = False
-    ) -> list[CommandDocItem]:
-        """Fetch commands from API using ApiClient."""
+        candidates: list[CommandDocItem] = []
+        for module_path in module_order:
+            candidates.extend(self._metadata_module_cache[module_path][1])
+        tiers = await asyncio.to_thread(split_permission_tiers, candidates)
+        self._metadata_merged_tiers = (merged_key, tiers)
+        return tiers
+
+    async def _fetch_command_tiers_from_api(
+        self,
+    ) -> tuple[list[CommandDocItem], list[CommandDocItem]]:
+        """Fetch (public, admin) command tiers from all configured dashboards."""
         if self._api_client is None:
             raise ValueError("API client is not initialized")
-        return await self._api_client.fetch_commands(include_admin_commands)
-
-    def _resolve_snapshot_for_event(self, event: AstrMessageEvent) -> HelpCacheSnapshot:
-        if event.is_admin() and event.is_private_chat():
-            if self._help_cache_admin_private.pages:
-                return self._help_cache_admin_private
-        return self._help_cache
-
-    async def _refresh_help_cache(self, force: bool = False) -> tuple[bool, str]:
-        async with self._refresh_lock:
-            try:
-                if not force and self._help_cache.pages:
-                    self._log_debug("帮助菜单缓存已就绪，跳过重复刷新。")
-                    return True, "帮助菜单缓存已就绪，已跳过重复刷新。"
+        return await self._api_client.fetch_command_tiers()
+
+    def _snapshot_registry_signature(self, mode: str) -> object:
+        """在事件循环上读取插件注册表摘要（纯数据），供刷新指纹使用。"""
+        if mode != self._MODE_METADATA:
+            return None
+        star_signature = sorted(
+            (
+                str(getattr(star, "name", "") or ""),
+                str(getattr(star, "module_path", "") or ""),
+            )
+            for star in self.context.get_all_stars()
+            if star.activated  # type: ignore[attr-defined]
+        )
+        handler_count = sum(1 for _ in star_handlers_registry)
+        return [star_signature, handler_count]
+
+    async def _refresh_help_cache(
+        self, force: bool = False, require_newer: bool = False
+    ) -> tuple[bool, str]:
+        """刷新帮助缓存；同一时间只运行一次刷新，并发调用者共享其结果。
+
+        require_newer 表示调用者需要在本次调用之后才开始的刷新（如插件变更、
+        手动刷新）。若此时已有刷新在进行，会在其结束后补跑一次，期间所有此类
+        调用者共享这一次补跑的结果。
+        """
+        running = self._refresh_task
+        followup = self._refresh_followup
+        if running is not None and not running.done() and not require_newer:
+            self._log_debug("已有刷新正在进行，等待其结果。")
+            task = running
+        elif followup is not None:
+            # 补跑尚未开始（前一次刷新可能刚结束、补跑还未被唤醒），直接共享它，
+            # 不能另起一次刷新与之并发。
+            self._log_debug("已有待执行的补跑刷新，等待其结果。")
+            task = followup
+        elif running is None or running.done():
+            task = asyncio.create_task(self._run_refresh(force or require_newer))
+            self._refresh_task = task
+        else:
+            self._log_debug("已有刷新正在进行，将在其结束后补跑一次。")
+            task = asyncio.create_task(self._run_followup_refresh(running))
+            self._refresh_followup = task
+        # 调用者被取消时不影响其他共享同一次刷新的调用者。
+        return await asyncio.shield(task)
+
+    async def _run_followup_refresh(
+        self, previous: asyncio.Task[tuple[bool, str]]
+    ) -> tuple[bool, str]:
+        await asyncio.wait({previous})
+        self._refresh_followup = None
+        self._refresh_task = asyncio.current_task()
+        return await self._run_refresh(force=True)
+
+    async def _run_refresh(self, force: bool) -> tuple[bool, str]:
+        try:
+            if not force and self._help_cache.ready:
+                self._log_debug("帮助菜单缓存已就绪，跳过重复刷新。")
+                return True, "帮助菜单缓存已就绪，已跳过重复刷新。"
 
-                mode = self._get_fetch_mode()
-                self._log(f"开始刷新帮助菜单缓存（{self._mode_display_name(mode)}）...")
+            mode = self._get_fetch_mode()
+            self._log(f"开始刷新帮助菜单缓存（{self._mode_display_name(mode)}）...")
 
-                if mode == self._MODE_METADATA:
-                    parsed_items_public = self._collect_items_from_metadata(
-                        include_admin_commands=False
-                    )
-                    parsed_items_admin_private = self._collect_items_from_metadata(
-                        include_admin_commands=True
-                    )
-                else:
-                    if not self._has_api_credentials():
-                        return (
-                            False,
-                            "帮助菜单刷新已跳过：当前为 API 模式，但未配置可用的 admin_name/admin_password。",
-                        )
-                    parsed_items_public = await self._fetch_commands_from_api(
-                        include_admin_commands=False
-                    )
-                    parsed_items_admin_private = await self._fetch_commands_from_api(
-                        include_admin_commands=True
+            if mode == self._MODE_METADATA:
+                (
+                    parsed_items_public,
+                    parsed_items_admin_private,
+                ) = await self._collect_items_from_metadata()
+            else:
+                if not self._has_api_credentials():
+                    return (
+                        False,
+                        "帮助菜单刷新已跳过：当前为 API 模式，但未配置可用的 admin_name/admin_password。",
                     )
-                self._log_debug(f"命令总数(普通): {len(parsed_items_public)}")
-                self._log_debug(
-                    f"命令总数(管理员私聊): {len(parsed_items_admin_private)}"
-                )
-
-                last_update = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                help_pages_public = build_pages(
+                (
                     parsed_items_public,
-                    len(parsed_items_public),
-                    last_update,
+                    parsed_items_admin_private,
+                ) = await self._fetch_command_tiers_from_api()
+                if not self._api_client.last_fetch_unchanged:
+                    self._api_fetch_applied = False
+            self._log_debug(f"命令总数(普通): {len(parsed_items_public)}")
+            self._log_debug(f"命令总数(管理员私聊): {len(parsed_items_admin_private)}")
+
+            # 只有注册表摘要在事件循环上读取；指纹计算与分页都是纯数据运算，
+            # 放到工作线程中执行，避免命令很多时阻塞其他会话的消息处理。
+            registry_signature = self._snapshot_registry_signature(mode)
+            last_update = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            previous = self._help_cache
+            if (
+                mode == self._MODE_API
+                and previous.ready
+                and self._api_fetch_applied
+                and self._api_client.last_fetch_unchanged
+            ):
+                # Dashboard 返回 304 或响应体哈希未变，连指纹都无需重新计算。
+                self._log_debug("Dashboard 命令列表未变化，跳过快照构建。")
+                fingerprint, snapshots = previous.fingerprint, None
+            else:
+                build_started = time.perf_counter()
+                fingerprint, snapshots = await asyncio.to_thread(
+                    build_help_snapshots,
                     mode,
                     self._MODE_API,
-                )
-                help_pages_admin_private = build_pages(
+                    registry_signature,
+                    parsed_items_public,
                     parsed_items_admin_private,
-                    len(parsed_items_admin_private),
+                    previous.fingerprint if previous.ready else "",
                     last_update,
-                    mode,
-                    self._MODE_API,
                 )
-                image_pages_public = build_image_pages(parsed_items_public)
-                image_pages_admin_private = build_image_pages(
-                    parsed_items_admin_private
-                )
-                self._help_cache = HelpCacheSnapshot(
-                    pages=tuple(help_pages_public),
-                    image_pages=tuple(image_pages_public),
-                    total_items=len(parsed_items_public),
-                    last_update=last_update,
-                    source_mode=mode,
-                )
-                self._help_cache_admin_private = HelpCacheSnapshot(
-                    pages=tuple(help_pages_admin_private),
-                    image_pages=tuple(image_pages_admin_private),
-                    total_items=len(parsed_items_admin_private),
-                    last_update=last_update,
-                    source_mode=mode,
+                self._log_debug(
+                    "快照构建耗时（工作线程）: "
+                    f"{(time.perf_counter() - build_started) * 1000:.1f} ms"
                 )
-                async with self._session_page_lock:
-                    self._session_page.clear()
+            self._api_fetch_applied = mode == self._MODE_API
+            if snapshots is None:
+                self._log_debug(f"刷新输入指纹未变化: {fingerprint[:16]}")
                 if mode == self._MODE_API:
                     self._clear_sensitive_config_if_needed()
                 return (
                     True,
                     (
-                        "帮助菜单刷新成功"
+                        "帮助菜单内容未变化，已跳过重建"
                         f"（{self._mode_display_name(mode)}），"
                         f"普通 {len(parsed_items_public)} 条，"
                         f"管理员私聊 {len(parsed_items_admin_private)} 条可用命令。"
+                        f"{self._describe_dashboard_failures(mode)}"
                     ),
                 )
-            except asyncio.TimeoutError:
-                self._log_debug("刷新失败阶段: network_timeout")
-                return False, "帮助菜单刷新失败：请求服务器超时，请稍后重试。"
-            except Exception as exc:  # noqa: BLE001
-                # Handle specific exception types
-                exc_class = exc.__class__.__name__
-                if exc_class == "ClientConnectionError":
-                    self._log_debug(f"刷新失败阶段: connect ({exc})")
-                    return False, f"帮助菜单刷新失败：无法连接服务器（{exc}）。"
-                if exc_class == "ClientError":
-                    self._log_debug(f"刷新失败阶段: client_error ({exc})")
-                    return False, f"帮助菜单刷新失败：网络请求异常（{exc}）。"
-                if isinstance(exc, HttpStatusError):
-                    status_error: HttpStatusError = exc
-                    self._log_debug(
-                        f"刷新失败阶段: {status_error.stage} status={status_error.status}"
-                    )
-                    return (
-                        False,
-                        f"帮助菜单刷新失败：{status_error.stage}接口异常（HTTP {status_error.status}）。",
-                    )
-                if isinstance(exc, PermissionError):
-                    self._log_debug(f"刷新失败阶段: permission ({exc})")
-                    return (
-                        False,
-                        "帮助菜单刷新失败：登录状态失效，请检查账号配置后重试。",
-                    )
-                if isinstance(exc, ValueError):
-                    self._log_debug(f"刷新失败阶段: value_error ({exc})")
-                    return False, f"帮助菜单刷新失败：{exc}"
-                logger.exception("[helpmenu] 刷新失败（未知异常）。")
-                return False, f"帮助菜单刷新失败：未知错误（{exc}）。"
 
-    async def _run_debounced_auto_refresh(self) -> None:
-        await asyncio.sleep(1.0)
-        if not self._plugin_change_pending:
-            return
-        self._plugin_change_pending = False
+            self._help_cache = HelpCacheVersion(
+                version=previous.version + 1,
+                fingerprint=fingerprint,
+                public=snapshots[0],
+                admin_private=snapshots[1],
+            )
+            self._readiness = self._READINESS_READY
+            self._log_debug(f"帮助缓存已切换到版本 {self._help_cache.version}")
+            moved = self._session_page.remap()
+            self._log_debug(f"已按插件锚点重新定位 {moved} 个会话的页码。")
+            await self._save_help_snapshot(self._help_cache)
+            if mode == self._MODE_API:
+                self._clear_sensitive_config_if_needed()
+            return (
+                True,
+                (
+                    "帮助菜单刷新成功"
+                    f"（{self._mode_display_name(mode)}），"
+                    f"普通 {len(parsed_items_public)} 条，"
+                    f"管理员私聊 {len(parsed_items_admin_private)} 条可用命令。"
+                    f"{self._describe_dashboard_failures(mode)}"
+                ),
+            )
+        except asyncio.TimeoutError:
+            self._log_debug("刷新失败阶段: network_timeout")
+            return (
+                False,
+                (
+                    "帮助菜单刷新失败：请求服务器超时，请稍后重试。"
+                    f"{self._describe_api_circuit()}"
+                ),
+            )
+        except Exception as exc:  # noqa: BLE001
+            # Handle specific exception types
+            if isinstance(exc, CircuitOpenError):
+                self._log_debug(f"刷新失败阶段: circuit_open ({exc})")
+                return (
+                    False,
+                    f"帮助菜单刷新失败：{exc}，期间将直接跳过对 Dashboard 的请求。",
+                )
+            exc_classes = {cls.__name__ for cls in type(exc).__mro__}
+            if "ClientConnectionError" in exc_classes:
+                self._log_debug(f"刷新失败阶段: connect ({exc})")
+                return (
+                    False,
+                    (
+                        f"帮助菜单刷新失败：无法连接服务器（{exc}）。"
+                        f"{self._describe_api_circuit()}"
+                    ),
+                )
+            if "ClientError" in exc_classes:
+                self._log_debug(f"刷新失败阶段: client_error ({exc})")
+                return (
+                    False,
+                    (
+                        f"帮助菜单刷新失败：网络请求异常（{exc}）。"
+                        f"{self._describe_api_circuit()}"
+                    ),
+                )
+            if isinstance(exc, HttpStatusError):
+                status_error: HttpStatusError = exc
+                self._log_debug(
+                    f"刷新失败阶段: {status_error.stage} status={status_error.status}"
+                )
+                return (
+                    False,
+                    (
+                        f"帮助菜单刷新失败：{status_error.stage}接口异常（HTTP {status_error.status}）。"
+                        f"{self._describe_api_circuit()}"
+                    ),
+                )
+            if isinstance(exc, PermissionError):
+                self._log_debug(f"刷新失败阶段: permission ({exc})")
+                return (
+                    False,
+                    "帮助菜单刷新失败：登录状态失效，请检查账号配置后重试。",
+                )
+            if isinstance(exc, ValueError):
+                self._log_debug(f"刷新失败阶段: value_error ({exc})")
+                return False, f"帮助菜单刷新失败：{exc}"
+            logger.exception("[helpmenu] 刷新失败（未知异常）。")
+            return False, f"帮助菜单刷新失败：未知错误（{exc}）。"
+
+    def _describe_dashboard_failures(self, mode: str) -> str:
+        """返回本次聚合刷新中拉取失败的 Dashboard 说明，全部成功时返回空字符串。"""
+        if mode != self._MODE_API or self._api_client is None:
+            return ""
+        failures = self._api_client.last_failures
+        if not failures:
+            return ""
+        reasons = [
+            "超时"
+            if isinstance(failure.error, asyncio.TimeoutError)
+            else type(failure.error).__name__
+            for failure in failures
+        ]
+        details = "、".join(
+            f"{failure.label}（{reason}）" for failure, reason in zip(failures, reasons)
+        )
+        return f"\n以下 Dashboard 拉取失败，已使用其余实例的结果：{details}"
 
-        ok, message = await self._refresh_help_cache(force=False)
-        if ok:
-            self._log("检测到插件变更，已合并触发一次自动刷新帮助文档。")
-            return
-        logger.warning(f"[helpmenu] 检测到插件变更，自动刷新帮助文档失败：{message}")
+    def _describe_api_circuit(self) -> str:
+        """返回 Dashboard 熔断器状态说明，状态正常时返回空字符串。"""
+        if self._api_client is None:
+            return ""
+        state = self._api_client.describe_circuit_state()
+        if not state:
+            return ""
+        return f"\nDashboard 请求状态：{state}。"
+
+    async def _run_debounced_auto_refresh(self) -> None:
+        # 每来一个事件静默窗口就顺延，但距批次首个事件不超过最长推迟时间；
+        # 刷新期间到达的事件会在本次刷新结束后合并为下一批。
+        while self._plugin_change_pending:
+            quiet_seconds, max_delay_seconds = self._get_auto_refresh_window()
+            while True:
+                now = self._clock()
+                deadline = min(
+                    self._plugin_change_last_at + quiet_seconds,
+                    self._plugin_change_first_at + max_delay_seconds,
+                )
+                if now >= deadline:
+                    break
+                await self._sleep(deadline - now)
+
+            events = self._plugin_change_events
+            waited = self._clock() - self._plugin_change_first_at
+            self._plugin_change_pending = False
+            self._plugin_change_events = 0
+            self._auto_refresh_count += 1
+            self._auto_refresh_coalesced_events += events
+            self._auto_refresh_max_batch = max(self._auto_refresh_max_batch, events)
+
+            ok, message = await self._refresh_help_cache(require_newer=True)
+            if ok:
+                self._log(
+                    f"检测到插件变更，已合并 {events} 个事件"
+                    f"（等待 {waited:.1f} 秒）触发一次自动刷新帮助文档。"
+                )
+            else:
+                logger.warning(
+                    f"[helpmenu] 检测到插件变更，自动刷新帮助文档失败：{message}"
+                )
 
     async def _auto_refresh_for_plugin_change(
         self, plugin_name: str, action: str
@@ -498,7 +862,12 @@ class MyPlugin(Star):
             )
             return
 
+        now = self._clock()
+        if not self._plugin_change_pending:
+            self._plugin_change_first_at = now
         self._plugin_change_pending = True
+        self._plugin_change_events += 1
+        self._plugin_change_last_at = now
         if self._plugin_refresh_task and not self._plugin_refresh_task.done():
             self._log_debug(
                 f"检测到插件{action}：{plugin_name}，已并入待执行刷新批次。"
@@ -511,7 +880,7 @@ class MyPlugin(Star):
         )
 
     def _parse_help_arg(self, message: str) -> str:
-        normalized = re.sub(r"\s+", " ", (message or "").strip())
+        normalized = normalize_whitespace(message or "")
         parts = normalized.split(" ", 1)
         if len(parts) < 2:
             return ""
@@ -522,24 +891,42 @@ class MyPlugin(Star):
         page = self._session_page.get(session_key)
         if page is None:
             return 1
-        self._session_page.move_to_end(session_key)
         return page
 
-    def _set_session_page(self, session_id: str, page: int) -> None:
-        session_key = self._normalize_session_key(session_id)
-        self._session_page[session_key] = page
-        self._session_page.move_to_end(session_key)
-        if len(self._session_page) <= self._SESSION_PAGE_CACHE_MAX_SIZE:
-            return
+    def _set_session_page(
+        self, session_id: str, page: int, view: str = "", anchor: str = ""
+    ) -> None:
+        self._session_page.set(
+            self._normalize_session_key(session_id), page, view, anchor
+        )
 
-        evicted_session, _ = self._session_page.popitem(last=False)
+    def _resolve_view(self, view: str) -> tuple[HelpCacheSnapshot, PageIndex, int]:
+        """根据视图标识（如 admin:image）返回对应快照、页码索引与总页数。"""
+        tier, _, kind = view.partition(":")
+        _, snapshot = self._help_cache.resolve(tier == "admin")
+        if kind == "image":
+            return snapshot, snapshot.image_page_index, len(snapshot.image_pages)
+        return snapshot, snapshot.page_index, len(snapshot.pages)
+
+    def _remap_session_position(self, position: SessionPosition) -> SessionPosition:
+        """把会话页码移动到新快照中其锚点插件所在的页。"""
+        if not position.view:
+            return position
+        _, page_index, total_pages = self._resolve_view(position.view)
+        page = page_index.locate(position.page, position.anchor, total_pages)
+        anchor = position.anchor
+        if anchor not in page_index.first_page:
+            anchor = page_index.anchor_of(page)
+        return position._replace(page=page, anchor=anchor)
+
+    def _log_session_eviction(self, evicted_session: str) -> None:
         evicted_session_safe = (
             f"{evicted_session[:16]}..."
             if len(evicted_session) > 16
             else evicted_session
         )
         self._log_debug(
-            f"session page cache exceeded {self._SESSION_PAGE_CACHE_MAX_SIZE}, "
+            f"session page cache exceeded {self._session_page.max_size}, "
             f"evicted session: {evicted_session_safe}",
         )
 
@@ -577,15 +964,39 @@ class MyPlugin(Star):
         return 1, f"页码参数无效: {arg}，已显示第 1 页。\n\n"
 
     async def _resolve_and_set_session_page(
-        self, arg: str, session_id: str, total_pages: int
+        self,
+        arg: str,
+        session_id: str,
+        total_pages: int,
+        view: str = "",
+        page_index: PageIndex | None = None,
     ) -> tuple[int, str]:
-        async with self._session_page_lock:
+        session_key = self._normalize_session_key(session_id)
+        if not arg:
+            # 不带翻页参数时只是读取当前页：内存中已有且位置不变时不加锁、不写回。
+            stored = self._session_page.get_position(session_key)
+            if stored is not None:
+                page, warning = self._resolve_page(arg, session_id, total_pages)
+                anchor = page_index.anchor_of(page) if page_index is not None else ""
+                if stored == SessionPosition(page, view, anchor):
+                    return page, warning
+            elif not self._session_page.persistent:
+                # 新会话停在第 1 页，与未记录等价，无需写入。
+                return self._resolve_page(arg, session_id, total_pages)
+        async with self._session_page.lock_for(session_key):
+            await self._session_page.load(session_key)
             page, warning = self._resolve_page(arg, session_id, total_pages)
-            self._set_session_page(session_id, page)
+            anchor = page_index.anchor_of(page) if page_index is not None else ""
+            position = SessionPosition(page, view, anchor)
+            if self._session_page.get_position(session_key) != position:
+                self._set_session_page(session_id, page, view, anchor)
             return page, warning
 
     @filter.on_plugin_loaded()
     async def on_plugin_loaded(self, metadata):
+        self._mark_metadata_module_dirty(
+            str(getattr(metadata, "module_path", "") or "").strip()
+        )
         await self._auto_refresh_for_plugin_change(
             str(getattr(metadata, "name", "") or "").strip(),
             "加载",
@@ -593,6 +1004,9 @@ class MyPlugin(Star):
 
     @filter.on_plugin_unloaded()
     async def on_plugin_unloaded(self, metadata):
+        self._mark_metadata_module_dirty(
+            str(getattr(metadata, "module_path", "") or "").strip()
+        )
         await self._auto_refresh_for_plugin_change(
             str(getattr(metadata, "name", "") or "").strip(),
             "卸载",
@@ -602,9 +1016,13 @@ class MyPlugin(Star):
     @filter.command("updateHelpMenu")
     async def update_helpmenu(self, event: AstrMessageEvent):
         """刷新已生成的帮助菜单文档。"""
-        ok, message = await self._refresh_help_cache(force=True)
+        self._invalidate_metadata_cache()
+        ok, message = await self._refresh_help_cache(require_newer=True)
         if ok:
-            yield event.plain_result(message)
+            yield event.plain_result(
+                f"{message}{self._describe_session_page_stats()}"
+                f"{self._describe_auto_refresh_stats()}"
+            )
             return
         if self._get_fetch_mode() == self._MODE_API:
             yield event.plain_result(
@@ -626,6 +1044,7 @@ class MyPlugin(Star):
                 self.config,
                 self._is_debug_enabled(),
                 self._log_debug,
+                self._http_sessions,
             )
 
             if fallback_message:
@@ -643,6 +1062,108 @@ class MyPlugin(Star):
             self._log_debug(f"异常堆栈: {traceback.format_exc()}")
             yield event.plain_result(f"文转图测试失败: {exc}")
 
+    async def _render_image_page(
+        self,
+        snapshot: HelpCacheSnapshot,
+        image_pages: tuple[tuple[dict[str, object], ...], ...],
+        page: int,
+        warning: str,
+    ) -> str:
+        """渲染单页帮助图片（含经典模板重试与后处理），返回图片 URL/路径。"""
+        self._log_debug("准备调用 render_help_page_as_image...")
+        try:
+            image_url = await render_help_page_as_image(
+                self.html_render,
+                self._templates_dir,
+                image_pages[page - 1],
+                warning,
+                page,
+                len(image_pages),
+                snapshot.total_items,
+                snapshot.last_update,
+                snapshot.source_mode,
+                self.config.get("light_template") or self.config.get("image_template"),
+                self.config.get("dark_template"),
+                str(self.config.get("dark_time_start", "18:00")),
+                str(self.config.get("dark_time_end", "06:00")),
+                self._get_template_layout_mode(),
+                self._is_debug_enabled(),
+            )
+        except Exception as exc:  # noqa: BLE001
+            self._log_debug(
+                f"首轮图片渲染失败，准备使用经典模板重试: {type(exc).__name__}: {exc}"
+            )
+            image_url = await render_help_page_as_image(
+                self.html_render,
+                self._templates_dir,
+                image_pages[page - 1],
+                warning,
+                page,
+                len(image_pages),
+                snapshot.total_items,
+                snapshot.last_update,
+                snapshot.source_mode,
+                self._DEFAULT_IMAGE_TEMPLATE,
+                None,
+                str(self.config.get("dark_time_start", "18:00")),
+                str(self.config.get("dark_time_end", "06:00")),
+                self._get_template_layout_mode(),
+                self._is_debug_enabled(),
+            )
+
+        self._log_debug(
+            f"图片渲染完成，URL: {image_url[:100] if len(image_url) > 100 else image_url}"
+        )
+        if not image_url:
+            raise ValueError("html_render 返回了空的图片 URL/路径")
+        if self._is_image_post_process_enabled():
+            self._log_debug("已启用图片后处理，尝试裁剪主卡片外白色背景。")
+            image_url = await crop_outer_white_background(
+                image_url, session_manager=self._http_sessions
+            )
+        return image_url
+
+    def _start_page_render(
+        self,
+        session_key: str,
+        render_key: tuple[int, str, int, str],
+        render: Coroutine[Any, Any, str],
+    ) -> asyncio.Task[str]:
+        """为会话启动渲染任务，并取消该会话尚未完成的旧渲染。
+
+        render_key 为 (缓存版本, 视图, 页码, 提示)；与进行中的渲染相同时直接复用。
+        调用者拿到任务后需在结束等待时调用 _release_page_render。
+        """
+        previous = self._page_renders.get(session_key)
+        if previous is not None and not previous[1].done():
+            if previous[0] == render_key:
+                render.close()
+                task = previous[1]
+                self._page_render_waiters[task] = (
+                    self._page_render_waiters.get(task, 0) + 1
+                )
+                return task
+            previous[1].cancel()
+        task = asyncio.create_task(render)
+        self._page_renders[session_key] = (render_key, task)
+        self._page_render_waiters[task] = 1
+        task.add_done_callback(lambda done: self._forget_page_render(session_key, done))
+        return task
+
+    def _release_page_render(self, task: asyncio.Task[str]) -> bool:
+        """登记一个等待者离开；返回是否已没有其他请求在等待该渲染。"""
+        waiters = self._page_render_waiters.get(task, 0) - 1
+        if waiters > 0:
+            self._page_render_waiters[task] = waiters
+            return False
+        self._page_render_waiters.pop(task, None)
+        return True
+
+    def _forget_page_render(self, session_key: str, task: asyncio.Task) -> None:
+        current = self._page_renders.get(session_key)
+        if current is not None and current[1] is task:
+            del self._page_renders[session_key]
+
     @filter.command("helpMenu")
     async def helpmenu(self, event: AstrMessageEvent):
         """展示支持翻页的帮助菜单。"""
@@ -658,7 +1179,18 @@ class MyPlugin(Star):
                 yield result
             return
 
-        if not self._help_cache.pages:
+        startup_task = self._startup_refresh_task
+        if self._readiness == self._READINESS_BUILDING and startup_task is not None:
+            # 首次刷新仍在后台进行：短暂等待其结果，不另起一次刷新。
+            self._log_debug("首次刷新尚未完成，等待其结果")
+            await asyncio.wait({startup_task}, timeout=self._STARTUP_WAIT_SECONDS)
+            if self._readiness == self._READINESS_BUILDING:
+                yield event.plain_result("帮助菜单正在生成中，请稍后再试。")
+                return
+
+        if not self._help_cache.ready:
+            # 尚无任何可用版本时只能等待刷新；之后的刷新都在后台替换版本，
+            # 期间读取方始终拿到上一个完整版本。
             self._log_debug("帮助缓存为空，尝试刷新")
             ok, message = await self._refresh_help_cache()
             if not ok:
@@ -676,9 +1208,10 @@ class MyPlugin(Star):
         )
         self._log_debug(f"命令参数: {arg if arg else '(无)'}")
 
-        snapshot = self._resolve_snapshot_for_event(event)
-        if not snapshot.pages:
-            snapshot = self._help_cache
+        help_cache = self._help_cache
+        tier, snapshot = help_cache.resolve(
+            bool(event.is_admin() and event.is_private_chat())
+        )
         output_mode = self._get_output_mode()
         self._log_debug(f"输出模式: {output_mode}")
         self._log_debug(
@@ -688,13 +1221,17 @@ class MyPlugin(Star):
         page_bucket = snapshot.pages
         image_page_bucket = snapshot.image_pages
         paging_session_id = session_id
+        view = f"{tier}:text"
+        page_index = snapshot.page_index
         if output_mode == self._OUTPUT_IMAGE and image_page_bucket:
             page_bucket = image_page_bucket
             paging_session_id = f"{session_id}:image"
+            view = f"{tier}:image"
+            page_index = snapshot.image_page_index
             self._log_debug("使用图片分页模式")
 
         page, warning = await self._resolve_and_set_session_page(
-            arg, paging_session_id, len(page_bucket)
+            arg, paging_session_id, len(page_bucket), view, page_index
         )
         page = max(1, min(page, len(page_bucket)))
         self._log_debug(f"解析后的页码: {page}")
@@ -704,56 +1241,26 @@ class MyPlugin(Star):
             self._log_debug(f"图片页面桶大小: {len(image_page_bucket)}")
             self._log_debug(f"当前页码: {page}")
             try:
-                self._log_debug("准备调用 render_help_page_as_image...")
+                render_task = self._start_page_render(
+                    self._normalize_session_key(paging_session_id),
+                    (help_cache.version, view, page, warning),
+                    self._render_image_page(snapshot, image_page_bucket, page, warning),
+                )
                 try:
-                    image_url = await render_help_page_as_image(
-                        self.html_render,
-                        self._templates_dir,
-                        image_page_bucket[page - 1],
-                        warning,
-                        page,
-                        len(image_page_bucket),
-                        snapshot.total_items,
-                        snapshot.last_update,
-                        snapshot.source_mode,
-                        self.config.get("light_template")
-                        or self.config.get("image_template"),
-                        self.config.get("dark_template"),
-                        str(self.config.get("dark_time_start", "18:00")),
-                        str(self.config.get("dark_time_end", "06:00")),
-                        self._get_template_layout_mode(),
-                        self._is_debug_enabled(),
-                    )
-                except Exception as exc:  # noqa: BLE001
+                    await asyncio.wait({render_task})
+                except asyncio.CancelledError:
+                    # 渲染可能与相同的请求共享，只有最后一个等待者离开时才取消。
+                    if self._release_page_render(render_task):
+                        render_task.cancel()
+                    raise
+                self._release_page_render(render_task)
+                if render_task.cancelled():
+                    self._suppressed_renders += 1
                     self._log_debug(
-                        f"首轮图片渲染失败，准备使用经典模板重试: {type(exc).__name__}: {exc}"
+                        f"会话有更新的翻页请求，已放弃第 {page} 页的过期渲染。"
                     )
-                    image_url = await render_help_page_as_image(
-                        self.html_render,
-                        self._templates_dir,
-                        image_page_bucket[page - 1],
-                        warning,
-                        page,
-                        len(image_page_bucket),
-                        snapshot.total_items,
-                        snapshot.last_update,
-                        snapshot.source_mode,
-                        self._DEFAULT_IMAGE_TEMPLATE,
-                        None,
-                        str(self.config.get("dark_time_start", "18:00")),
-                        str(self.config.get("dark_time_end", "06:00")),
-                        self._get_template_layout_mode(),
-                        self._is_debug_enabled(),
-                    )
-
-                self._log_debug(
-                    f"图片渲染完成，URL: {image_url[:100] if len(image_url) > 100 else image_url}"
-                )
-                if not image_url:
-                    raise ValueError("html_render 返回了空的图片 URL/路径")
-                if self._is_image_post_process_enabled():
-                    self._log_debug("已启用图片后处理，尝试裁剪主卡片外白色背景。")
-                    image_url = await crop_outer_white_background(image_url)
+                    return
+                image_url = render_task.result()
                 yield event.image_result(image_url)
                 return
             except Exception as exc:  # noqa: BLE001
@@ -776,6 +1283,20 @@ class MyPlugin(Star):
         yield event.plain_result(text)
 
     async def terminate(self):
+        if self._startup_refresh_task and not self._startup_refresh_task.done():
+            self._startup_refresh_task.cancel()
+            try:
+                await self._startup_refresh_task
+            except asyncio.CancelledError:
+                pass
+        self._startup_refresh_task = None
+        if self._periodic_refresh_task and not self._periodic_refresh_task.done():
+            self._periodic_refresh_task.cancel()
+            try:
+                await self._periodic_refresh_task
+            except asyncio.CancelledError:
+                pass
+        self._periodic_refresh_task = None
         if self._plugin_refresh_task and not self._plugin_refresh_task.done():
             self._plugin_refresh_task.cancel()
             try:
@@ -784,7 +1305,23 @@ class MyPlugin(Star):
                 pass
         self._plugin_refresh_task = None
         self._plugin_change_pending = False
+        self._plugin_change_events = 0
+        for _, render_task in list(self._page_renders.values()):
+            render_task.cancel()
+        self._page_renders.clear()
+        self._page_render_waiters.clear()
+        refresh_tasks = {
+            task
+            for task in (self._refresh_followup, self._refresh_task)
+            if task is not None and not task.done()
+        }
+        for task in refresh_tasks:
+            task.cancel()
+        if refresh_tasks:
+            await asyncio.wait(refresh_tasks)
+        self._refresh_task = None
+        self._refresh_followup = None
         if self._api_client is not None:
             await self._api_client.close()
-        async with self._session_page_lock:
-            self._session_page.clear()
+        await self._http_sessions.close()
+        await self._session_page.close()
@@ -1,6 +1,6 @@
 import re
 from collections import defaultdict
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 
 @dataclass(slots=True)
@@ -10,6 +10,43 @@ class CommandDocItem:
     description: str
     aliases: list[str]
     permission: str = "everyone"
+    source: str = ""
+
+
+@dataclass(slots=True)
+class PageIndex:
+    """插件与页码的对应关系，在分页时顺带生成，用于刷新后重新定位会话页码。"""
+
+    # 插件名 -> 该插件首次出现的页码（从 1 开始）
+    first_page: dict[str, int] = field(default_factory=dict)
+    # 第 i 页（从 0 开始）的锚点插件：优先取该页首个新开始的插件，
+    # 整页都是上一插件的续页时取该插件。
+    page_anchor: list[str] = field(default_factory=list)
+    # 锚点仍为续页插件的页码
+    continued_pages: set[int] = field(default_factory=set)
+
+    def record(self, plugin_name: str, page_number: int) -> None:
+        starts_here = plugin_name not in self.first_page
+        self.first_page.setdefault(plugin_name, page_number)
+        if len(self.page_anchor) < page_number:
+            self.page_anchor.append(plugin_name)
+            if not starts_here:
+                self.continued_pages.add(page_number)
+        elif starts_here and page_number in self.continued_pages:
+            self.page_anchor[page_number - 1] = plugin_name
+            self.continued_pages.discard(page_number)
+
+    def anchor_of(self, page: int) -> str:
+        """返回指定页的锚点插件名，页码越界时返回空字符串。"""
+        if 1 <= page <= len(self.page_anchor):
+            return self.page_anchor[page - 1]
+        return ""
+
+    def locate(self, page: int, anchor: str, total_pages: int) -> int:
+        """返回当前包含 anchor 插件的页码；插件已不存在时保留原页码。"""
+        if anchor and self.anchor_of(page) != anchor and anchor in self.first_page:
+            page = self.first_page[anchor]
+        return min(max(page, 1), max(total_pages, 1))
 
 
 def extract_arg_lines(description: str) -> tuple[str, list[dict[str, str]]]:
@@ -53,8 +90,9 @@ def build_pages(
     source_mode: str,
     mode_api: str = "api",
     page_size: int = 32,
+    page_index: PageIndex | None = None,
 ) -> list[str]:
-    """构建文本帮助页面。"""
+    """构建文本帮助页面；传入 page_index 时顺带记录插件所在页码。"""
     if page_size <= 0:
         raise ValueError("page_size must be greater than 0")
     if not items:
@@ -77,6 +115,8 @@ def build_pages(
                 current_page = []
                 current_units = 0
 
+            if page_index is not None:
+                page_index.record(plugin_name, len(page_blocks) + 1)
             title = f"[{plugin_name}{'(续)' if is_continued else ''}]"
             current_page.append(title)
             current_units += 1
@@ -87,7 +127,10 @@ def build_pages(
                 estimated_units = 1 + (1 if entry.aliases else 0) + len(args)
                 if current_units + estimated_units > page_size and current_units > 1:
                     break
-                current_page.append(f"/{entry.command} - {entry.description}")
+                source_suffix = f" [{entry.source}]" if entry.source else ""
+                current_page.append(
+                    f"/{entry.command} - {entry.description}{source_suffix}"
+                )
                 current_units += 1
                 if entry.aliases:
                     current_page.append(f"  别名: {', '.join(entry.aliases)}")
@@ -103,11 +146,11 @@ def build_pages(
 
     pages: list[str] = []
     total_pages = len(page_blocks)
-    for page_index, block_lines in enumerate(page_blocks, start=1):
+    for page_no, block_lines in enumerate(page_blocks, start=1):
         lines = [
             "指令帮助菜单",
             (
-                f"第 {page_index}/{total_pages} 页 | "
+                f"第 {page_no}/{total_pages} 页 | "
                 f"命令数: {total_items} | "
                 f"来源: {mode_display_name(source_mode, mode_api)} | "
                 f"文档更新时间: {last_update}"
@@ -124,8 +167,9 @@ def build_image_pages(
     items: list[CommandDocItem],
     page_size: int = 42,
     card_size: int = 14,
+    page_index: PageIndex | None = None,
 ) -> list[tuple[dict[str, object], ...]]:
-    """构建图片帮助页面数据结构。"""
+    """构建图片帮助页面数据结构；传入 page_index 时顺带记录插件所在页码。"""
     if page_size <= 0 or card_size <= 0:
         raise ValueError("image page_size and card_size must be greater than 0")
     if not items:
@@ -154,6 +198,7 @@ def build_image_pages(
                     "description": clean_desc,
                     "args": args,
                     "aliases": ", ".join(entry.aliases),
+                    "source": entry.source,
                 }
                 command_units = 1 + (1 if entry.aliases else 0) + len(args)
                 if card_commands and card_units + command_units > card_size:
@@ -173,6 +218,8 @@ def build_image_pages(
                 current_page = []
                 current_units = 0
 
+            if page_index is not None:
+                page_index.record(plugin_name, len(pages) + 1)
             current_page.append(card)
             current_units += card_units
             is_continued = pointer < len(plugin_items)
@@ -0,0 +1,417 @@
+"""Per-session page position storage for ``/helpMenu`` navigation.
+
+Sessions are spread over shards by key hash. Each shard owns its own slice of
+the LRU and its own ``asyncio.Lock``, so navigation in different chats never
+waits on the same lock. Capacity is enforced on the whole store: every write
+is stamped with a global sequence number, and when the store is full the
+oldest head among the shards is evicted, so an uneven hash spread does not
+evict sessions early. Reading the current page takes no lock at all: a shard's mapping is only
+ever mutated in place by synchronous code, and ``remap`` swaps in fresh
+mappings instead of mutating the old ones.
+
+Entries expire after a TTL. Expiry uses a bucketed timing wheel: each entry
+is filed under the bucket of its deadline, and every write sweeps the buckets
+that have passed, so expiring costs O(1) amortized per write instead of a scan.
+
+Each position remembers the view it belongs to and the plugin shown at the top
+of the page (its anchor). After the help menu is rebuilt, ``remap`` moves every
+session to the page that now holds its anchor instead of resetting it.
+
+Optionally, positions are persisted to SQLite (WAL mode) so they survive
+restarts. Writes are batched in memory and flushed periodically; sessions are
+loaded lazily the first time they are navigated after a restart.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+from typing import NamedTuple
+
+from astrbot.api import logger
+
+DEFAULT_SHARD_COUNT = 16
+DEFAULT_FLUSH_INTERVAL_SECONDS = 5.0
+DEFAULT_FLUSH_BATCH_SIZE = 256
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+# The TTL is split into this many wheel buckets; expiry is accurate to one.
+TIMING_WHEEL_SLOTS = 64
+
+
+class SessionPosition(NamedTuple):
+    page: int
+    # Which page list the session is reading, e.g. ``public:text``.
+    view: str = ""
+    # Plugin shown at the top of the page when it was last navigated.
+    anchor: str = ""
+
+
+class SessionPageDatabase:
+    """SQLite table of ``session_key -> (page, view, anchor, updated_at)``.
+
+    Methods are blocking and meant to be called through ``asyncio.to_thread``;
+    an internal lock serializes them because worker threads may differ between
+    calls.
+    """
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS session_pages ("
+                "session_key TEXT PRIMARY KEY, "
+                "page INTEGER NOT NULL, "
+                "view TEXT NOT NULL DEFAULT '', "
+                "anchor TEXT NOT NULL DEFAULT '', "
+                "updated_at REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_session_pages_updated_at "
+                "ON session_pages (updated_at)"
+            )
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def load(self, session_key: str, not_before: float) -> SessionPosition | None:
+        """Return the stored position unless it is missing or older than ``not_before``."""
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT page, view, anchor FROM session_pages "
+                    "WHERE session_key = ? AND updated_at >= ?",
+                    (session_key, not_before),
+                )
+                .fetchone()
+            )
+        return SessionPosition(int(row[0]), row[1], row[2]) if row else None
+
+    def write_batch(
+        self,
+        rows: list[tuple[str, int, str, str, float]],
+        max_rows: int,
+        not_before: float,
+    ) -> None:
+        """Upsert ``rows`` and prune expired rows and rows beyond ``max_rows``."""
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.executemany(
+                    "INSERT INTO session_pages "
+                    "(session_key, page, view, anchor, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(session_key) DO UPDATE SET "
+                    "page = excluded.page, view = excluded.view, "
+                    "anchor = excluded.anchor, updated_at = excluded.updated_at",
+                    rows,
+                )
+                connection.execute(
+                    "DELETE FROM session_pages WHERE updated_at < ?", (not_before,)
+                )
+                connection.execute(
+                    "DELETE FROM session_pages WHERE session_key NOT IN ("
+                    "SELECT session_key FROM session_pages "
+                    "ORDER BY updated_at DESC LIMIT ?)",
+                    (max_rows,),
+                )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class _SessionShard:
+    __slots__ = ("deadlines", "entries", "lock", "written")
+
+    def __init__(self) -> None:
+        self.entries: OrderedDict[str, SessionPosition] = OrderedDict()
+        # Wheel bucket after which each entry expires.
+        self.deadlines: dict[str, int] = {}
+        # Global write sequence of each entry, for store-wide LRU eviction.
+        self.written: dict[str, int] = {}
+        self.lock = asyncio.Lock()
+
+
+class ShardedSessionStore:
+    """Sharded LRU mapping session keys to their current position.
+
+    Writers must hold ``lock_for(key)`` around their read-modify-write (and
+    around ``load``) so that concurrent navigation in the same chat stays
+    ordered; ``get`` may be called without it.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        shard_count: int = DEFAULT_SHARD_COUNT,
+        on_evict: Callable[[str], None] | None = None,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL_SECONDS,
+        flush_batch_size: int = DEFAULT_FLUSH_BATCH_SIZE,
+        resolver: Callable[[SessionPosition], SessionPosition] | None = None,
+    ):
+        if max_size <= 0 or shard_count <= 0:
+            raise ValueError("max_size and shard_count must be greater than 0")
+        self.max_size = max_size
+        self.shard_count = min(shard_count, max_size)
+        self._shards = tuple(_SessionShard() for _ in range(self.shard_count))
+        self._size = 0
+        self._write_sequence = 0
+        self._on_evict = on_evict
+        self._resolver = resolver
+        self.evictions = 0
+        self.expirations = 0
+
+        self.ttl_seconds = ttl_seconds
+        self._bucket_width = max(1.0, ttl_seconds / TIMING_WHEEL_SLOTS)
+        self._wheel: dict[int, set[str]] = {}
+        self._wheel_cursor = self._current_bucket()
+        self.flush_interval = flush_interval
+        self.flush_batch_size = flush_batch_size
+        self._database: SessionPageDatabase | None = None
+        self._dirty: dict[str, tuple[SessionPosition, float]] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: asyncio.Task | None = None
+        self._flush_wakeup = asyncio.Event()
+
+    def _shard(self, key: str) -> _SessionShard:
+        return self._shards[hash(key) % self.shard_count]
+
+    def lock_for(self, key: str) -> asyncio.Lock:
+        """Return the lock guarding the shard that owns ``key``."""
+        return self._shard(key).lock
+
+    def get_position(self, key: str) -> SessionPosition | None:
+        """Lock-free lookup of the stored position; expired entries read as missing."""
+        shard = self._shard(key)
+        position = shard.entries.get(key)
+        if position is None or self.ttl_seconds <= 0:
+            return position
+        if shard.deadlines.get(key, -1) < self._current_bucket():
+            return None
+        return position
+
+    def get(self, key: str) -> int | None:
+        """Lock-free lookup of the stored page."""
+        position = self.get_position(key)
+        return None if position is None else position.page
+
+    def set(self, key: str, page: int, view: str = "", anchor: str = "") -> None:
+        """Store the position and evict the shard's least recently written entry."""
+        position = SessionPosition(page, view, anchor)
+        self._insert(key, position)
+        self._mark_dirty(key, position)
+
+    def _mark_dirty(self, key: str, position: SessionPosition) -> None:
+        if self._database is None:
+            return
+        self._dirty[key] = (position, time.time())
+        self._ensure_flush_task()
+        if len(self._dirty) >= self.flush_batch_size:
+            self._flush_wakeup.set()
+
+    def _insert(self, key: str, position: SessionPosition) -> None:
+        shard = self._shard(key)
+        entries = shard.entries
+        if key not in entries:
+            self._size += 1
+        entries[key] = position
+        entries.move_to_end(key)
+        self._write_sequence += 1
+        shard.written[key] = self._write_sequence
+        if self.ttl_seconds > 0:
+            now_bucket = self._current_bucket()
+            deadline = self._bucket_of(time.monotonic() + self.ttl_seconds)
+            shard.deadlines[key] = deadline
+            self._wheel.setdefault(deadline, set()).add(key)
+            self._expire(now_bucket)
+        while self._size > self.max_size:
+            self._evict_oldest()
+
+    def _evict_oldest(self) -> None:
+        """Evict the least recently written entry of the whole store.
+
+        Each shard's OrderedDict is in write order, so the oldest entry is
+        one of the shard heads; this costs O(shard_count) per eviction.
+        """
+        oldest = min(
+            (shard for shard in self._shards if shard.entries),
+            key=lambda shard: shard.written[next(iter(shard.entries))],
+        )
+        evicted_key, _ = oldest.entries.popitem(last=False)
+        oldest.deadlines.pop(evicted_key, None)
+        del oldest.written[evicted_key]
+        self._size -= 1
+        self.evictions += 1
+        if self._on_evict is not None:
+            self._on_evict(evicted_key)
+
+    def _bucket_of(self, timestamp: float) -> int:
+        return int(timestamp // self._bucket_width)
+
+    def _current_bucket(self) -> int:
+        return self._bucket_of(time.monotonic())
+
+    def _expire(self, now_bucket: int) -> None:
+        """Drop entries filed under wheel buckets that lie in the past."""
+        wheel = self._wheel
+        while self._wheel_cursor < now_bucket:
+            if not wheel:
+                break
+            keys = wheel.pop(self._wheel_cursor, None)
+            bucket = self._wheel_cursor
+            self._wheel_cursor += 1
+            if keys is None:
+                # Skip straight to the oldest occupied bucket after idle gaps.
+                self._wheel_cursor = max(self._wheel_cursor, min(wheel))
+                continue
+            for key in keys:
+                shard = self._shard(key)
+                # Keys re-written later stay filed under their old bucket too.
+                if shard.deadlines.get(key) != bucket:
+                    continue
+                del shard.deadlines[key]
+                if shard.entries.pop(key, None) is not None:
+                    del shard.written[key]
+                    self._size -= 1
+                self.expirations += 1
+        self._wheel_cursor = max(self._wheel_cursor, now_bucket)
+
+    def remap(self) -> int:
+        """Re-resolve every position with the resolver; return how many moved.
+
+        Each shard gets a new mapping in the same LRU order, so lock-free
+        readers never observe a half-updated shard.
+        """
+        resolver = self._resolver
+        if resolver is None:
+            return 0
+        moved = 0
+        for shard in self._shards:
+            remapped: OrderedDict[str, SessionPosition] = OrderedDict()
+            for key, position in shard.entries.items():
+                resolved = resolver(position)
+                if resolved != position:
+                    moved += 1
+                    pending = self._dirty.get(key)
+                    if pending is not None:
+                        # Keep the original write time so TTL pruning is unchanged.
+                        self._dirty[key] = (resolved, pending[1])
+                    else:
+                        self._mark_dirty(key, resolved)
+                remapped[key] = resolved
+            shard.entries = remapped
+        return moved
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def persistent(self) -> bool:
+        return self._database is not None
+
+    def enable_persistence(self, database: SessionPageDatabase) -> None:
+        """Persist positions to ``database`` from now on."""
+        self._database = database
+
+    async def load(self, key: str) -> None:
+        """Lazily pull ``key`` from the database if it is not in memory.
+
+        Call with ``lock_for(key)`` held, before reading the page.
+        """
+        database = self._database
+        if database is None or self.get(key) is not None:
+            return
+        pending = self._dirty.get(key)
+        if pending is not None:
+            self._insert(key, pending[0])
+            return
+        try:
+            position = await asyncio.to_thread(database.load, key, self._not_before())
+        except (sqlite3.Error, OSError) as exc:
+            logger.warning(f"[helpmenu] 读取持久化的会话页码失败：{exc}")
+            return
+        if position is None or self.get(key) is not None:
+            return
+        # The row may predate the latest rebuild; move it to its anchor.
+        if self._resolver is not None:
+            position = self._resolver(position)
+        self._insert(key, position)
+
+    def _not_before(self) -> float:
+        """Wall-clock cutoff for persisted rows (0 when the TTL is disabled)."""
+        if self.ttl_seconds <= 0:
+            return 0.0
+        return time.time() - self.ttl_seconds
+
+    def _ensure_flush_task(self) -> None:
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._run_flush_loop())
+
+    async def _run_flush_loop(self) -> None:
+        while self._dirty:
+            try:
+                await asyncio.wait_for(
+                    self._flush_wakeup.wait(), timeout=self.flush_interval
+                )
+            except TimeoutError:
+                pass
+            self._flush_wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Write pending positions to the database in one transaction."""
+        database = self._database
+        if database is None:
+            return
+        async with self._flush_lock:
+            if not self._dirty:
+                return
+            dirty, self._dirty = self._dirty, {}
+            rows = [
+                (key, position.page, position.view, position.anchor, updated_at)
+                for key, (position, updated_at) in dirty.items()
+            ]
+            try:
+                await asyncio.to_thread(
+                    database.write_batch,
+                    rows,
+                    self.max_size,
+                    self._not_before(),
+                )
+            except (sqlite3.Error, OSError) as exc:
+                logger.warning(f"[helpmenu] 写入会话页码持久化失败：{exc}")
+
+    async def close(self) -> None:
+        """Stop the background writer, flush pending writes and close the database."""
+        if self._flush_task is not None and not self._flush_task.done():
+            # Wake the writer instead of cancelling it so an in-flight batch
+            # is not lost halfway through.
+            self._flush_wakeup.set()
+            await self._flush_task
+        self._flush_task = None
+        await self.flush()
+        for shard in self._shards:
+            shard.entries = OrderedDict()
+            shard.deadlines = {}
+            shard.written = {}
+        self._size = 0
+        self._wheel = {}
+        if self._database is not None:
+            await asyncio.to_thread(self._database.close)
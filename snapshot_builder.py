@@ -0,0 +1,240 @@
+"""Pure construction of help-cache snapshots.
+
+Everything here works on plain data (``CommandDocItem`` lists, strings and
+JSON-able registry signatures) and never touches AstrBot objects. A refresh
+only snapshots the plugin registry on the event loop. The rest runs in a
+worker thread via ``asyncio.to_thread``: the tier split, fingerprinting and
+text/image pagination. Inputs and outputs are picklable, so a process pool
+would work as well.
+
+A built version can also be dumped to a JSON document and loaded back. That
+lets the plugin serve the last snapshot right after a restart while the
+first refresh revalidates it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+
+from .command_walker import can_show_command
+from .page_builder import CommandDocItem, PageIndex, build_image_pages, build_pages
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+@dataclass(slots=True, frozen=True)
+class HelpCacheSnapshot:
+    pages: tuple[str, ...]
+    image_pages: tuple[tuple[dict[str, object], ...], ...]
+    total_items: int
+    last_update: str
+    source_mode: str
+    page_index: PageIndex = field(default_factory=PageIndex)
+    image_page_index: PageIndex = field(default_factory=PageIndex)
+
+
+@dataclass(slots=True, frozen=True)
+class HelpCacheVersion:
+    """Both permission tiers of one refresh, swapped in as a single object."""
+
+    version: int
+    fingerprint: str
+    public: HelpCacheSnapshot
+    admin_private: HelpCacheSnapshot
+
+    @property
+    def ready(self) -> bool:
+        return bool(self.public.pages)
+
+    def resolve(self, admin_private: bool) -> tuple[str, HelpCacheSnapshot]:
+        """Return ``(tier, snapshot)``, falling back to public when admin is empty."""
+        if admin_private and self.admin_private.pages:
+            return "admin", self.admin_private
+        return "public", self.public
+
+
+def split_permission_tiers(
+    candidates: list[CommandDocItem],
+) -> tuple[list[CommandDocItem], list[CommandDocItem]]:
+    """Split candidates into sorted (public, admin) tiers sharing the same items."""
+    public_items: list[CommandDocItem] = []
+    admin_items: list[CommandDocItem] = []
+    public_dedup: set[tuple[str, str]] = set()
+    admin_dedup: set[tuple[str, str]] = set()
+    for item in candidates:
+        dedup_key = (item.plugin_name, item.command)
+        if dedup_key not in admin_dedup and can_show_command(
+            item.permission, include_admin_commands=True
+        ):
+            admin_dedup.add(dedup_key)
+            admin_items.append(item)
+        if dedup_key not in public_dedup and can_show_command(item.permission):
+            public_dedup.add(dedup_key)
+            public_items.append(item)
+
+    def sort_key(item: CommandDocItem) -> tuple[str, str]:
+        return item.plugin_name.lower(), item.command.lower()
+
+    public_items.sort(key=sort_key)
+    admin_items.sort(key=sort_key)
+    return public_items, admin_items
+
+
+def compute_refresh_fingerprint(
+    mode: str,
+    registry_signature: object,
+    items_public: list[CommandDocItem],
+    items_admin_private: list[CommandDocItem],
+) -> str:
+    """Hash the refresh inputs so unchanged refreshes can skip rebuilding.
+
+    ``registry_signature`` is any JSON-able summary of the plugin registry
+    taken on the event loop, or ``None`` when it does not apply (API mode).
+    """
+    digest = hashlib.sha256(mode.encode("utf-8"))
+    if registry_signature is not None:
+        digest.update(
+            json.dumps(registry_signature, ensure_ascii=False).encode("utf-8")
+        )
+    for items in (items_public, items_admin_private):
+        digest.update(f"#{len(items)}".encode())
+        for item in items:
+            digest.update(
+                "\x1f".join(
+                    (
+                        item.plugin_name,
+                        item.command,
+                        item.permission,
+                        item.description,
+                        item.source,
+                        *item.aliases,
+                    )
+                ).encode("utf-8")
+            )
+            digest.update(b"\x1e")
+    return digest.hexdigest()
+
+
+def build_tier_snapshot(
+    items: list[CommandDocItem], last_update: str, mode: str, mode_api: str
+) -> HelpCacheSnapshot:
+    """Paginate one permission tier into text and image pages with their indexes."""
+    page_index = PageIndex()
+    image_page_index = PageIndex()
+    pages = build_pages(
+        items, len(items), last_update, mode, mode_api, page_index=page_index
+    )
+    image_pages = build_image_pages(items, page_index=image_page_index)
+    return HelpCacheSnapshot(
+        pages=tuple(pages),
+        image_pages=tuple(image_pages),
+        total_items=len(items),
+        last_update=last_update,
+        source_mode=mode,
+        page_index=page_index,
+        image_page_index=image_page_index,
+    )
+
+
+def build_help_snapshots(
+    mode: str,
+    mode_api: str,
+    registry_signature: object,
+    items_public: list[CommandDocItem],
+    items_admin_private: list[CommandDocItem],
+    previous_fingerprint: str,
+    last_update: str,
+) -> tuple[str, tuple[HelpCacheSnapshot, HelpCacheSnapshot] | None]:
+    """Fingerprint the inputs and build both tiers unless nothing changed.
+
+    Returns ``(fingerprint, (public, admin_private))``, or ``(fingerprint,
+    None)`` when the fingerprint equals ``previous_fingerprint``.
+    """
+    fingerprint = compute_refresh_fingerprint(
+        mode, registry_signature, items_public, items_admin_private
+    )
+    if fingerprint == previous_fingerprint:
+        return fingerprint, None
+    return fingerprint, (
+        build_tier_snapshot(items_public, last_update, mode, mode_api),
+        build_tier_snapshot(items_admin_private, last_update, mode, mode_api),
+    )
+
+
+def _dump_page_index(page_index: PageIndex) -> dict[str, object]:
+    return {
+        "first_page": page_index.first_page,
+        "page_anchor": page_index.page_anchor,
+        "continued_pages": sorted(page_index.continued_pages),
+    }
+
+
+def _load_page_index(data: dict) -> PageIndex:
+    return PageIndex(
+        first_page={str(key): int(value) for key, value in data["first_page"].items()},
+        page_anchor=[str(plugin) for plugin in data["page_anchor"]],
+        continued_pages={int(page) for page in data["continued_pages"]},
+    )
+
+
+def _dump_snapshot(snapshot: HelpCacheSnapshot) -> dict[str, object]:
+    return {
+        "pages": snapshot.pages,
+        "image_pages": snapshot.image_pages,
+        "total_items": snapshot.total_items,
+        "last_update": snapshot.last_update,
+        "source_mode": snapshot.source_mode,
+        "page_index": _dump_page_index(snapshot.page_index),
+        "image_page_index": _dump_page_index(snapshot.image_page_index),
+    }
+
+
+def _load_snapshot(data: dict) -> HelpCacheSnapshot:
+    return HelpCacheSnapshot(
+        pages=tuple(str(page) for page in data["pages"]),
+        image_pages=tuple(tuple(page) for page in data["image_pages"]),
+        total_items=int(data["total_items"]),
+        last_update=str(data["last_update"]),
+        source_mode=str(data["source_mode"]),
+        page_index=_load_page_index(data["page_index"]),
+        image_page_index=_load_page_index(data["image_page_index"]),
+    )
+
+
+def dump_help_cache(cache: HelpCacheVersion) -> bytes:
+    """Serialize both tiers and the fingerprint as compact UTF-8 JSON.
+
+    The in-memory version counter is not stored; it only orders swaps
+    within one process.
+    """
+    document = {
+        "format": SNAPSHOT_FORMAT_VERSION,
+        "fingerprint": cache.fingerprint,
+        "public": _dump_snapshot(cache.public),
+        "admin_private": _dump_snapshot(cache.admin_private),
+    }
+    return json.dumps(document, ensure_ascii=False, separators=(",", ":")).encode(
+        "utf-8"
+    )
+
+
+def load_help_cache(payload: bytes, version: int) -> HelpCacheVersion:
+    """Rebuild a ``HelpCacheVersion`` written by ``dump_help_cache``.
+
+    Raises:
+        ValueError: If the payload is not a snapshot of the current format.
+    """
+    try:
+        document = json.loads(payload.decode("utf-8"))
+        if document.get("format") != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"unsupported snapshot format: {document.get('format')}")
+        return HelpCacheVersion(
+            version=version,
+            fingerprint=str(document["fingerprint"]),
+            public=_load_snapshot(document["public"]),
+            admin_private=_load_snapshot(document["admin_private"]),
+        )
+    except (AttributeError, KeyError, TypeError, UnicodeDecodeError) as exc:
+        raise ValueError(f"malformed snapshot: {exc!r}") from exc
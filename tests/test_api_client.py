@@ -0,0 +1,293 @@
+import asyncio
+import importlib
+import logging
+import sys
+import types
+from importlib import util
+from pathlib import Path
+
+import pytest
+
+PLUGIN_ROOT = Path(__file__).resolve().parent.parent
+PACKAGE_NAME = "helpmenu_plugin"
+
+# Other test modules may have installed a stand-in aiohttp; the client needs the real one.
+if getattr(sys.modules.get("aiohttp"), "__spec__", None) is None:
+    sys.modules.pop("aiohttp", None)
+pytest.importorskip("aiohttp")
+for name in ("astrbot", "astrbot.api"):
+    sys.modules.setdefault(name, types.ModuleType(name))
+if not isinstance(getattr(sys.modules["astrbot.api"], "logger", None), logging.Logger):
+    sys.modules["astrbot.api"].logger = logging.getLogger("helpmenu.test")
+if PACKAGE_NAME not in sys.modules:
+    fake_package = types.ModuleType(PACKAGE_NAME)
+    fake_package.__path__ = [str(PLUGIN_ROOT)]
+    sys.modules[PACKAGE_NAME] = fake_package
+API_CLIENT = importlib.import_module(f"{PACKAGE_NAME}.api_client")
+ApiClient = API_CLIENT.ApiClient
+
+STUB_SPEC = util.spec_from_file_location(
+    "helpmenu_dashboard_stub", PLUGIN_ROOT / "benchmarks" / "dashboard_stub.py"
+)
+assert STUB_SPEC and STUB_SPEC.loader
+DASHBOARD_STUB = util.module_from_spec(STUB_SPEC)
+# dataclasses resolves string annotations through sys.modules.
+sys.modules[STUB_SPEC.name] = DASHBOARD_STUB
+STUB_SPEC.loader.exec_module(DASHBOARD_STUB)
+DashboardStub = DASHBOARD_STUB.DashboardStub
+StubOptions = DASHBOARD_STUB.StubOptions
+generate_command_items = DASHBOARD_STUB.generate_command_items
+
+
+class ParkedSleep:
+    """Stand-in for ``asyncio.sleep`` that parks each call until the test releases it."""
+
+    def __init__(self):
+        self._parked: asyncio.Queue[tuple[float, asyncio.Future]] = asyncio.Queue()
+
+    async def __call__(self, delay: float) -> None:
+        wake = asyncio.get_running_loop().create_future()
+        await self._parked.put((delay, wake))
+        await wake
+
+    async def next(self) -> tuple[float, asyncio.Future]:
+        return await asyncio.wait_for(self._parked.get(), 5)
+
+
+def with_dashboard(scenario, client_kwargs: dict | None = None, **options):
+    """Run ``scenario(dashboard, client)`` against a freshly started dashboard stub."""
+
+    async def runner():
+        async with DashboardStub(StubOptions(**options)) as dashboard:
+            client = ApiClient(
+                {
+                    "ASTRHost": dashboard.base_url,
+                    "admin_name": dashboard.options.username,
+                    "admin_password": dashboard.options.password,
+                },
+                **(client_kwargs or {}),
+            )
+            try:
+                return await scenario(dashboard, client)
+            finally:
+                await client.close()
+
+    return asyncio.run(runner())
+
+
+def summarize(tiers) -> list[list[tuple]]:
+    return [
+        [(item.plugin_name, item.command, item.permission) for item in tier]
+        for tier in tiers
+    ]
+
+
+def test_both_tiers_come_from_one_commands_request() -> None:
+    async def scenario(dashboard, client):
+        public_items, admin_items = await client.fetch_command_tiers()
+        assert dashboard.counters.commands == 1
+        assert dashboard.counters.logins == 1
+        return public_items, admin_items
+
+    public_items, admin_items = with_dashboard(scenario, commands=60, admin_ratio=0.3)
+
+    assert 0 < len(public_items) < len(admin_items)
+    admin_ids = {id(item) for item in admin_items}
+    assert all(id(item) in admin_ids for item in public_items)
+    assert all(item.permission != "admin" for item in public_items)
+
+
+def test_etag_revalidation_reuses_parsed_tiers() -> None:
+    async def scenario(dashboard, client):
+        first = await client.fetch_command_tiers()
+        assert not client.last_fetch_unchanged
+        second = await client.fetch_command_tiers()
+        assert client.last_fetch_unchanged
+        assert second is first
+        assert dashboard.counters.not_modified == 1
+
+        dashboard.set_items(generate_command_items(StubOptions(commands=5)))
+        third = await client.fetch_command_tiers()
+        assert not client.last_fetch_unchanged
+        assert len(third[1]) != len(first[1])
+        assert dashboard.counters.not_modified == 1
+
+    with_dashboard(scenario, etag=True, commands=40)
+
+
+def test_identical_body_without_validators_skips_parsing() -> None:
+    async def scenario(dashboard, client):
+        first = await client.fetch_command_tiers()
+        second = await client.fetch_command_tiers()
+        assert client.last_fetch_unchanged
+        assert second is first
+        assert dashboard.counters.commands == 2
+        assert dashboard.counters.not_modified == 0
+
+    with_dashboard(scenario, etag=False, commands=40)
+
+
+def test_streamed_parse_matches_buffered_parse(monkeypatch: pytest.MonkeyPatch) -> None:
+    pytest.importorskip("ijson")
+
+    async def scenario(dashboard, client):
+        buffered = await client.fetch_command_tiers()
+        monkeypatch.setattr(API_CLIENT, "STREAM_PARSE_MIN_BYTES", 0)
+        streamed_calls = []
+        stream_tiers = client._stream_command_item_tiers
+
+        async def counted(response):
+            streamed_calls.append(response.status)
+            return await stream_tiers(response)
+
+        client._stream_command_item_tiers = counted
+        client._reset_command_cache()
+        streamed = await client.fetch_command_tiers()
+        assert streamed_calls == [200]
+        assert summarize(streamed) == summarize(buffered)
+
+        # The streamed body hash still short-circuits an identical response.
+        await client.fetch_command_tiers()
+        assert client.last_fetch_unchanged
+
+    with_dashboard(scenario, commands=300)
+
+
+def test_streamed_parse_rejects_truncated_json(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    pytest.importorskip("ijson")
+    monkeypatch.setattr(API_CLIENT, "STREAM_PARSE_MIN_BYTES", 0)
+
+    async def scenario(dashboard, client):
+        with pytest.raises(ValueError, match="流式解析失败"):
+            await client.fetch_command_tiers()
+
+    with_dashboard(scenario, commands=50, malformed_rate=1.0)
+
+
+def test_retry_delays_are_jittered_within_the_backoff_cap() -> None:
+    policy = API_CLIENT.RetryPolicy(max_attempts=5, base_delay=0.5, max_delay=2.0)
+
+    for attempt, cap in ((1, 0.5), (2, 1.0), (3, 2.0), (4, 2.0)):
+        delays = {policy.compute_delay(attempt) for _ in range(50)}
+        assert all(0 <= delay <= cap for delay in delays)
+        assert len(delays) > 1
+
+
+def test_server_errors_are_retried_then_trip_the_circuit() -> None:
+    now = [0.0]
+    breaker = API_CLIENT.CircuitBreaker(
+        failure_threshold=4, cooldown_seconds=60, clock=lambda: now[0]
+    )
+    retry_policy = API_CLIENT.RetryPolicy(max_attempts=3, base_delay=1.0, max_delay=8.0)
+    delays: list[float] = []
+
+    async def record_sleep(delay: float) -> None:
+        delays.append(delay)
+
+    async def scenario(dashboard, client):
+        client._sleep = record_sleep
+        with pytest.raises(API_CLIENT.HttpStatusError):
+            await client.fetch_command_tiers()
+        assert dashboard.counters.commands == 3
+        assert breaker.state == breaker.CLOSED
+        assert len(delays) == 2
+        assert 0 <= delays[0] <= 1.0
+        assert 0 <= delays[1] <= 2.0
+
+        # The fourth failure opens the circuit without spending the retries.
+        with pytest.raises(API_CLIENT.HttpStatusError):
+            await client.fetch_command_tiers()
+        assert dashboard.counters.commands == 4
+        assert breaker.state == breaker.OPEN
+        assert len(delays) == 2
+
+        with pytest.raises(API_CLIENT.CircuitOpenError):
+            await client.fetch_command_tiers()
+        assert dashboard.counters.commands == 4
+
+        # After the cool-down a single probe is let through and closes it again.
+        now[0] += 61
+        dashboard.options.server_error_rate = 0.0
+        await client.fetch_command_tiers()
+        assert dashboard.counters.commands == 5
+        assert breaker.state == breaker.CLOSED
+        assert client.describe_circuit_state() == "正常"
+        assert len(delays) == 2
+
+    with_dashboard(
+        scenario,
+        client_kwargs={"retry_policy": retry_policy, "circuit_breaker": breaker},
+        server_error_rate=1.0,
+    )
+
+
+def test_token_is_renewed_ahead_of_expiry() -> None:
+    renew_delay = 3600 - API_CLIENT.TOKEN_RENEW_AHEAD_SECONDS
+
+    async def scenario(dashboard, client):
+        client.config["api_token_auto_renew"] = True
+        parked = ParkedSleep()
+        client._sleep = parked
+        await client.fetch_command_tiers()
+        delay, wake = await parked.next()
+        assert delay == pytest.approx(renew_delay, abs=2)
+        assert dashboard.counters.logins == 1
+
+        wake.set_result(None)
+        delay, wake = await parked.next()
+        assert delay == pytest.approx(renew_delay, abs=2)
+        assert dashboard.counters.logins == 2
+
+        # Refreshes keep using the renewed token instead of logging in.
+        await client.fetch_command_tiers()
+        assert dashboard.counters.logins == 2
+        assert dashboard.counters.commands == 2
+
+        # A failed renewal waits the minimum delay before trying again.
+        dashboard.options.password = "rotated"
+        wake.set_result(None)
+        delay, wake = await parked.next()
+        assert delay == API_CLIENT.TOKEN_RENEW_MIN_DELAY_SECONDS
+        assert dashboard.counters.logins == 3
+
+        await client.close()
+        assert wake.cancelled()
+        assert dashboard.counters.logins == 3
+
+    with_dashboard(scenario)
+
+
+def test_token_renewal_is_off_by_default() -> None:
+    async def scenario(dashboard, client):
+        await client.fetch_command_tiers()
+        assert client._token_renew_task is None
+        assert dashboard.counters.logins == 1
+
+    with_dashboard(scenario)
+
+
+def test_concurrent_callers_share_one_login() -> None:
+    async def scenario(dashboard, client):
+        results = await asyncio.gather(
+            *(client.fetch_command_tiers() for _ in range(10))
+        )
+        assert dashboard.counters.logins == 1
+        assert all(summarize(tiers) == summarize(results[0]) for tiers in results)
+
+    with_dashboard(scenario, latency_ms=30)
+
+
+def test_rejected_token_triggers_a_single_relogin() -> None:
+    async def scenario(dashboard, client):
+        await client.fetch_command_tiers()
+        # A dashboard restart invalidates every token issued so far.
+        dashboard._secret = b"rotated-secret"
+
+        await asyncio.gather(*(client.fetch_command_tiers() for _ in range(8)))
+
+        assert dashboard.counters.logins == 2
+        assert dashboard.counters.commands == 1 + 8 * 2
+
+    with_dashboard(scenario, latency_ms=20)
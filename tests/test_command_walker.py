@@ -0,0 +1,79 @@
+import sys
+import types
+from importlib import util
+from pathlib import Path
+
+PLUGIN_ROOT = Path(__file__).resolve().parent.parent
+PACKAGE_NAME = "helpmenu_plugin"
+
+if PACKAGE_NAME not in sys.modules:
+    fake_package = types.ModuleType(PACKAGE_NAME)
+    fake_package.__path__ = [str(PLUGIN_ROOT)]
+    sys.modules[PACKAGE_NAME] = fake_package
+
+SPEC = util.spec_from_file_location(
+    f"{PACKAGE_NAME}.command_walker", PLUGIN_ROOT / "command_walker.py"
+)
+assert SPEC and SPEC.loader
+COMMAND_WALKER = util.module_from_spec(SPEC)
+SPEC.loader.exec_module(COMMAND_WALKER)
+extract_command_tiers = COMMAND_WALKER.extract_command_tiers
+
+
+def make_node(command: str, **overrides) -> dict:
+    node = {
+        "plugin": "demo",
+        "plugin_display_name": "Demo",
+        "type": "command",
+        "enabled": True,
+        "permission": "everyone",
+        "effective_command": command,
+        "description": "demo command",
+        "aliases": [],
+        "sub_commands": [],
+    }
+    node.update(overrides)
+    return node
+
+
+def test_extract_command_tiers_splits_permissions_and_dedups() -> None:
+    group = make_node(
+        "group",
+        type="group",
+        sub_commands=[
+            make_node("group add", type="sub_command", permission="admin"),
+            make_node("group  list", type="sub_command", aliases=["  ls ", 1, ""]),
+            make_node("group list", type="sub_command", description="duplicate"),
+        ],
+    )
+    hidden = make_node("hidden", enabled=False)
+
+    public_items, admin_items = extract_command_tiers([group, hidden, "junk"])
+
+    assert [item.command for item in public_items] == ["group list"]
+    assert [item.command for item in admin_items] == ["group add", "group list"]
+    assert public_items[0] is admin_items[1]
+    assert public_items[0].aliases == ["ls"]
+    assert public_items[0].description == "demo command"
+
+
+def test_extract_command_tiers_skips_excluded_plugin_subtree() -> None:
+    builtin = make_node(
+        "help",
+        plugin="builtin_commands",
+        sub_commands=[make_node("help more", type="sub_command")],
+    )
+
+    assert extract_command_tiers([builtin]) == ([], [])
+
+
+def test_extract_command_tiers_handles_deep_trees_without_recursion() -> None:
+    root = node = make_node("level 0")
+    for level in range(1, 5000):
+        child = make_node(f"level {level}", type="sub_command")
+        node["sub_commands"].append(child)
+        node = child
+
+    public_items, admin_items = extract_command_tiers([root])
+
+    assert len(public_items) == len(admin_items) == 5000
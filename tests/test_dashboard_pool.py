@@ -0,0 +1,126 @@
+import asyncio
+import importlib
+import logging
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+PLUGIN_ROOT = Path(__file__).resolve().parent.parent
+PACKAGE_NAME = "helpmenu_plugin"
+
+
+def _install_fake_astrbot() -> None:
+    for name in ("astrbot", "astrbot.api"):
+        sys.modules.setdefault(name, types.ModuleType(name))
+    fake_api = sys.modules["astrbot.api"]
+    if not hasattr(fake_api, "AstrBotConfig"):
+        fake_api.AstrBotConfig = dict
+    if not isinstance(getattr(fake_api, "logger", None), logging.Logger):
+        fake_api.logger = logging.getLogger("helpmenu.test")
+
+
+# Other test modules may have installed a stand-in aiohttp; the pool needs the real one.
+if getattr(sys.modules.get("aiohttp"), "__spec__", None) is None:
+    sys.modules.pop("aiohttp", None)
+pytest.importorskip("aiohttp")
+_install_fake_astrbot()
+if PACKAGE_NAME not in sys.modules:
+    fake_package = types.ModuleType(PACKAGE_NAME)
+    fake_package.__path__ = [str(PLUGIN_ROOT)]
+    sys.modules[PACKAGE_NAME] = fake_package
+DASHBOARD_POOL = importlib.import_module(f"{PACKAGE_NAME}.dashboard_pool")
+DashboardPool = DASHBOARD_POOL.DashboardPool
+CommandDocItem = sys.modules[f"{PACKAGE_NAME}.page_builder"].CommandDocItem
+
+
+def make_pool(**config) -> DashboardPool:
+    config.setdefault("ASTRHost", "http://bot-a:6185")
+    config.setdefault("admin_name", "astrbot")
+    config.setdefault("admin_password", "astrbot")
+    config.setdefault("extra_dashboards", ["http://bot-b:6185|astrbot|astrbot"])
+    return DashboardPool(config)
+
+
+def serve(pool: DashboardPool, label: str, fetch) -> None:
+    """Replace the fetch of the endpoint called ``label``."""
+    for endpoint in pool.endpoints:
+        if endpoint.label == label:
+            endpoint.client.fetch_command_tiers = fetch
+            return
+    raise KeyError(label)
+
+
+def tiers(public: list, admin: list):
+    async def fetch():
+        return public, admin
+
+    return fetch
+
+
+def test_merge_keeps_command_public_on_any_host() -> None:
+    pool = make_pool()
+    shared_admin = CommandDocItem("demo", "sync", "admin only here", [], "admin")
+    shared_public = CommandDocItem("demo", "sync", "open here", [], "everyone")
+    only_a = CommandDocItem("demo", "reload", "", [], "admin")
+    serve(pool, "bot-a:6185", tiers([], [shared_admin, only_a]))
+    serve(pool, "bot-b:6185", tiers([shared_public], [shared_public]))
+
+    public_items, admin_items = asyncio.run(pool.fetch_command_tiers())
+
+    assert [(item.command, item.source) for item in public_items] == [
+        ("sync", "bot-b:6185")
+    ]
+    assert public_items[0].permission == "everyone"
+    assert [(item.command, item.source) for item in admin_items] == [
+        ("reload", "bot-a:6185"),
+        ("sync", "bot-a:6185, bot-b:6185"),
+    ]
+    assert admin_items[1].description == "open here"
+    # The clients' cached items are left untouched.
+    assert shared_public.source == ""
+
+
+def test_failed_and_slow_hosts_are_skipped() -> None:
+    pool = make_pool(
+        api_host_timeout=0.05,
+        extra_dashboards=[
+            "http://bot-b:6185|astrbot|astrbot",
+            "http://bot-c:6185|astrbot|astrbot",
+        ],
+    )
+    item = CommandDocItem("demo", "ping", "", [], "everyone")
+
+    async def broken():
+        raise RuntimeError("boom")
+
+    async def slow():
+        await asyncio.sleep(1)
+        return [item], [item]
+
+    serve(pool, "bot-a:6185", tiers([item], [item]))
+    serve(pool, "bot-b:6185", broken)
+    serve(pool, "bot-c:6185", slow)
+
+    public_items, _ = asyncio.run(pool.fetch_command_tiers())
+
+    assert [(entry.command, entry.source) for entry in public_items] == [
+        ("ping", "bot-a:6185")
+    ]
+    failures = {failure.label: type(failure.error) for failure in pool.last_failures}
+    assert failures == {"bot-b:6185": RuntimeError, "bot-c:6185": TimeoutError}
+    assert not pool.last_fetch_unchanged
+
+
+def test_all_hosts_failing_raises_first_error() -> None:
+    pool = make_pool()
+
+    async def broken():
+        raise RuntimeError("boom")
+
+    serve(pool, "bot-a:6185", broken)
+    serve(pool, "bot-b:6185", broken)
+
+    with pytest.raises(RuntimeError, match="boom"):
+        asyncio.run(pool.fetch_command_tiers())
@@ -0,0 +1,127 @@
+import asyncio
+import importlib
+import logging
+import ssl
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+PLUGIN_ROOT = Path(__file__).resolve().parent.parent
+PACKAGE_NAME = "helpmenu_plugin"
+
+# Other test modules may have installed a stand-in aiohttp; these tests need the real one.
+if getattr(sys.modules.get("aiohttp"), "__spec__", None) is None:
+    sys.modules.pop("aiohttp", None)
+aiohttp = pytest.importorskip("aiohttp")
+web = pytest.importorskip("aiohttp.web")
+for name in ("astrbot", "astrbot.api"):
+    sys.modules.setdefault(name, types.ModuleType(name))
+if not isinstance(getattr(sys.modules["astrbot.api"], "logger", None), logging.Logger):
+    sys.modules["astrbot.api"].logger = logging.getLogger("helpmenu.test")
+if PACKAGE_NAME not in sys.modules:
+    fake_package = types.ModuleType(PACKAGE_NAME)
+    fake_package.__path__ = [str(PLUGIN_ROOT)]
+    sys.modules[PACKAGE_NAME] = fake_package
+HTTP_SESSION = importlib.import_module(f"{PACKAGE_NAME}.http_session")
+IMAGE_POST_PROCESSOR = importlib.import_module(f"{PACKAGE_NAME}.image_post_processor")
+HttpSessionManager = HTTP_SESSION.HttpSessionManager
+
+
+def test_sessions_are_reused_and_share_one_connector() -> None:
+    async def scenario() -> None:
+        manager = HttpSessionManager()
+        direct = await manager.get_session()
+        concurrent = await asyncio.gather(*(manager.get_session() for _ in range(5)))
+        proxied = await manager.get_session(trust_env=True)
+
+        assert all(session is direct for session in concurrent)
+        assert proxied is not direct
+        assert proxied.trust_env and not direct.trust_env
+        assert proxied.connector is direct.connector
+        await manager.close()
+
+    asyncio.run(scenario())
+
+
+def test_connector_trusts_the_system_store_without_certifi(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    find_spec = importlib.util.find_spec
+    monkeypatch.setattr(
+        importlib.util,
+        "find_spec",
+        lambda name, *args: None if name == "certifi" else find_spec(name, *args),
+    )
+    system_only = ssl.create_default_context().cert_store_stats()
+
+    async def scenario() -> None:
+        manager = HttpSessionManager()
+        session = await manager.get_session()
+        assert not session.connector.closed
+        await manager.close()
+
+    context = HTTP_SESSION._build_ssl_context()
+    assert isinstance(context, ssl.SSLContext)
+    assert context.verify_mode == ssl.CERT_REQUIRED
+    assert context.cert_store_stats() == system_only
+    asyncio.run(scenario())
+
+
+def test_certifi_bundle_is_added_to_the_system_store() -> None:
+    pytest.importorskip("certifi")
+    system_only = ssl.create_default_context().cert_store_stats()
+
+    stats = HTTP_SESSION._build_ssl_context().cert_store_stats()
+
+    assert stats["x509_ca"] >= max(1, system_only["x509_ca"])
+
+
+def test_close_releases_sessions_and_connector() -> None:
+    async def scenario() -> None:
+        manager = HttpSessionManager()
+        session = await manager.get_session()
+        connector = session.connector
+
+        await manager.close()
+
+        assert session.closed
+        assert connector.closed
+        reopened = await manager.get_session()
+        assert reopened is not session
+        assert not reopened.closed
+        await manager.close()
+        await manager.close()
+
+    asyncio.run(scenario())
+
+
+def test_remote_image_download_uses_the_shared_session() -> None:
+    payload = b"\x89PNG fake image"
+
+    async def image(request: web.Request) -> web.Response:
+        return web.Response(body=payload, content_type="image/png")
+
+    async def scenario() -> tuple[bytes, bytes]:
+        app = web.Application()
+        app.router.add_get("/help.png", image)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        url = f"http://127.0.0.1:{port}/help.png"
+        manager = HttpSessionManager()
+        try:
+            shared = await IMAGE_POST_PROCESSOR._download_remote_image(
+                url, session_manager=manager
+            )
+            assert not (await manager.get_session()).closed
+            owned = await IMAGE_POST_PROCESSOR._download_remote_image(url)
+            return shared.read_bytes(), owned.read_bytes()
+        finally:
+            await manager.close()
+            await runner.cleanup()
+
+    assert asyncio.run(scenario()) == (payload, payload)
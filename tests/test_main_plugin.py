@@ -0,0 +1,886 @@
+import asyncio
+import enum
+import heapq
+import importlib
+import logging
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+PLUGIN_ROOT = Path(__file__).resolve().parent.parent
+PACKAGE_NAME = "helpmenu_plugin"
+
+
+class FakeConfig(dict):
+    def save_config(self) -> None:
+        pass
+
+
+class PermissionType(enum.Enum):
+    ADMIN = "admin"
+    MEMBER = "member"
+
+
+class PermissionTypeFilter:
+    def __init__(self, permission_type: PermissionType):
+        self.permission_type = permission_type
+
+
+class CommandFilter:
+    def __init__(self, *names: str):
+        self.names = names
+
+    def get_complete_command_names(self) -> list[str]:
+        return list(self.names)
+
+
+class CommandGroupFilter(CommandFilter):
+    pass
+
+
+class FakeStar:
+    def __init__(self, context):
+        self.context = context
+
+
+class FakeStarTools:
+    data_dir = Path(".")
+
+    @classmethod
+    def get_data_dir(cls, name=None) -> Path:
+        return cls.data_dir
+
+
+def _keep_function(*args, **kwargs):
+    return lambda function: function
+
+
+def _install_fake_astrbot() -> None:
+    def module(name: str, **attrs) -> None:
+        fake = sys.modules.get(name) or types.ModuleType(name)
+        fake.__dict__.update(attrs)
+        sys.modules[name] = fake
+
+    fake_filter = types.SimpleNamespace(
+        command=_keep_function,
+        permission_type=_keep_function,
+        on_plugin_loaded=_keep_function,
+        on_plugin_unloaded=_keep_function,
+        PermissionType=PermissionType,
+    )
+    module("astrbot")
+    module("astrbot.api", logger=logging.getLogger("helpmenu.test"))
+    sys.modules["astrbot.api"].AstrBotConfig = FakeConfig
+    module("astrbot.api.event", AstrMessageEvent=object, filter=fake_filter)
+    module(
+        "astrbot.api.star",
+        Context=object,
+        Star=FakeStar,
+        StarTools=FakeStarTools,
+        register=_keep_function,
+    )
+    for name in ("astrbot.core", "astrbot.core.star", "astrbot.core.star.filter"):
+        module(name)
+    module("astrbot.core.star.filter.command", CommandFilter=CommandFilter)
+    module(
+        "astrbot.core.star.filter.command_group", CommandGroupFilter=CommandGroupFilter
+    )
+    module(
+        "astrbot.core.star.filter.permission",
+        PermissionType=PermissionType,
+        PermissionTypeFilter=PermissionTypeFilter,
+    )
+    module("astrbot.core.star.star_handler", star_handlers_registry=[])
+
+
+# Other test modules may have installed a stand-in aiohttp; main needs the real one.
+if getattr(sys.modules.get("aiohttp"), "__spec__", None) is None:
+    sys.modules.pop("aiohttp", None)
+pytest.importorskip("aiohttp")
+_install_fake_astrbot()
+if PACKAGE_NAME not in sys.modules:
+    fake_package = types.ModuleType(PACKAGE_NAME)
+    fake_package.__path__ = [str(PLUGIN_ROOT)]
+    sys.modules[PACKAGE_NAME] = fake_package
+MAIN = importlib.import_module(f"{PACKAGE_NAME}.main")
+REGISTRY = sys.modules["astrbot.core.star.star_handler"].star_handlers_registry
+CommandDocItem = sys.modules[f"{PACKAGE_NAME}.page_builder"].CommandDocItem
+
+
+class StarMetadata:
+    def __init__(self, name: str):
+        self.name = name
+        self.module_path = f"plugins.{name}.main"
+        self.display_name = name.title()
+        self.activated = True
+
+
+class Handler:
+    def __init__(self, module_path: str, command: str):
+        self.handler_module_path = module_path
+        self.desc = f"{command} 的说明"
+        self.event_filters = [CommandFilter(command)]
+
+
+class FakeContext:
+    def __init__(self):
+        self.stars: list[StarMetadata] = []
+
+    def get_all_stars(self) -> list[StarMetadata]:
+        return self.stars
+
+
+class FakeEvent:
+    def __init__(self, message: str, session: str = "group-1"):
+        self.message_str = message
+        self._session = session
+
+    def is_admin(self) -> bool:
+        return False
+
+    def is_private_chat(self) -> bool:
+        return False
+
+    def get_session_id(self) -> str:
+        return self._session
+
+    def plain_result(self, text: str) -> tuple[str, str]:
+        return "text", text
+
+    def image_result(self, url: str) -> tuple[str, str]:
+        return "image", url
+
+
+class FakeDashboard:
+    """Stands in for DashboardPool; ``unchanged`` mimics a 304 response."""
+
+    def __init__(self, commands: list[str]):
+        self.items = [CommandDocItem("demo", command, "", []) for command in commands]
+        self.unchanged = False
+        self.last_fetch_unchanged = False
+        self.last_failures: list = []
+        self.fetches = 0
+
+    def has_credentials(self) -> bool:
+        return True
+
+    def describe_circuit_state(self) -> str:
+        return ""
+
+    def clear_cached_credentials(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    async def fetch_command_tiers(self) -> tuple[list, list]:
+        self.fetches += 1
+        self.last_fetch_unchanged = self.unchanged
+        return list(self.items), list(self.items)
+
+
+def populate(context: FakeContext, plugins: int, commands: int = 3) -> None:
+    context.stars.clear()
+    REGISTRY.clear()
+    for plugin_index in range(plugins):
+        star = StarMetadata(f"plugin{plugin_index}")
+        context.stars.append(star)
+        for command_index in range(commands):
+            REGISTRY.append(
+                Handler(star.module_path, f"cmd{plugin_index}_{command_index}")
+            )
+
+
+def make_plugin(tmp_path: Path, **config) -> tuple:
+    FakeStarTools.data_dir = tmp_path
+    context = FakeContext()
+    populate(context, plugins=3)
+    config.setdefault("output_mode", "text")
+    config.setdefault("persist_help_snapshot", False)
+    return MAIN.MyPlugin(context, FakeConfig(config)), context
+
+
+async def collect(results) -> list:
+    return [result async for result in results]
+
+
+def count_refreshes(plugin, gate: asyncio.Event | None = None) -> dict[str, int]:
+    """Wrap _run_refresh to record how many refreshes run and overlap.
+
+    With ``gate`` set, each refresh waits for it before doing any work.
+    """
+    stats = {"runs": 0, "active": 0, "max_active": 0}
+    run_refresh = plugin._run_refresh
+
+    async def counted(force: bool):
+        stats["runs"] += 1
+        stats["active"] += 1
+        stats["max_active"] = max(stats["max_active"], stats["active"])
+        try:
+            if gate is not None:
+                await gate.wait()
+            return await run_refresh(force)
+        finally:
+            stats["active"] -= 1
+
+    plugin._run_refresh = counted
+    return stats
+
+
+class ParkedSleep:
+    """Stand-in for ``asyncio.sleep`` that parks each call until the test releases it."""
+
+    def __init__(self):
+        self._parked: asyncio.Queue[tuple[float, asyncio.Future]] = asyncio.Queue()
+
+    async def __call__(self, delay: float) -> None:
+        wake = asyncio.get_running_loop().create_future()
+        await self._parked.put((delay, wake))
+        await wake
+
+    async def next(self) -> tuple[float, asyncio.Future]:
+        return await asyncio.wait_for(self._parked.get(), 5)
+
+
+class VirtualClock:
+    """Monotonic clock plus ``sleep`` that only move when the test advances them."""
+
+    def __init__(self):
+        self.now = 0.0
+        self._sleepers: list[tuple[float, int, asyncio.Future]] = []
+        self._serial = 0
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, delay: float) -> None:
+        wake = asyncio.get_running_loop().create_future()
+        self._serial += 1
+        heapq.heappush(self._sleepers, (self.now + delay, self._serial, wake))
+        await wake
+
+    async def advance(self, seconds: float) -> None:
+        """Move time forward, waking due sleepers in order and letting them run."""
+        target = self.now + seconds
+        await settle()
+        while self._sleepers and self._sleepers[0][0] <= target:
+            wake_at, _, wake = heapq.heappop(self._sleepers)
+            self.now = wake_at
+            if not wake.done():
+                wake.set_result(None)
+            await settle()
+        self.now = target
+        await settle()
+
+
+async def settle() -> None:
+    """Let every task that is ready run until it blocks again."""
+    for _ in range(50):
+        await asyncio.sleep(0)
+
+
+async def until(predicate) -> None:
+    """Yield to the event loop until ``predicate()`` holds."""
+    for _ in range(1000):
+        if predicate():
+            return
+        await asyncio.sleep(0)
+    raise AssertionError("condition was never reached")
+
+
+def fake_renders(plugin, gate: asyncio.Event) -> tuple[list[int], list[int]]:
+    """Replace the image renderer with one that waits for ``gate``.
+
+    Returns the pages whose render was requested and those that completed.
+    """
+    requested: list[int] = []
+    finished: list[int] = []
+
+    def start(snapshot, image_pages, page, warning):
+        requested.append(page)
+
+        async def render() -> str:
+            await gate.wait()
+            finished.append(page)
+            return f"page-{page}.png"
+
+        return render()
+
+    plugin._render_image_page = start
+    return requested, finished
+
+
+def test_refresh_is_single_flight_with_one_followup(tmp_path: Path) -> None:
+    async def scenario() -> dict[str, int]:
+        plugin, _ = make_plugin(tmp_path)
+        gate = asyncio.Event()
+        stats = count_refreshes(plugin, gate)
+
+        first = asyncio.create_task(plugin._refresh_help_cache(force=True))
+        await until(lambda: stats["active"] == 1)
+        late: list[asyncio.Task] = []
+        # Runs as soon as the first refresh finishes, before the queued
+        # follow-up has woken up to take over.
+        plugin._refresh_task.add_done_callback(
+            lambda _: late.extend(
+                asyncio.create_task(plugin._refresh_help_cache(force=force))
+                for force in (False, True)
+            )
+        )
+        joined = asyncio.create_task(plugin._refresh_help_cache())
+        newer = [
+            asyncio.create_task(plugin._refresh_help_cache(require_newer=True))
+            for _ in range(3)
+        ]
+        await settle()
+        gate.set()
+        await first
+        results = await asyncio.gather(joined, *newer, *late)
+        assert len(results) == 6
+        assert all(ok for ok, _ in results)
+        await plugin.terminate()
+        return stats
+
+    stats = asyncio.run(scenario())
+
+    assert stats["runs"] == 2
+    assert stats["max_active"] == 1
+
+
+def test_refresh_caller_cancellation_does_not_abort_shared_refresh(
+    tmp_path: Path,
+) -> None:
+    async def scenario() -> tuple[bool, int]:
+        plugin, _ = make_plugin(tmp_path)
+        gate = asyncio.Event()
+        stats = count_refreshes(plugin, gate)
+
+        cancelled = asyncio.create_task(plugin._refresh_help_cache(force=True))
+        await until(lambda: stats["active"] == 1)
+        waiting = asyncio.create_task(plugin._refresh_help_cache())
+        await settle()
+        cancelled.cancel()
+        gate.set()
+        ok, _ = await waiting
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        await plugin.terminate()
+        return ok, stats["runs"]
+
+    assert asyncio.run(scenario()) == (True, 1)
+
+
+def count_module_parses(plugin) -> list[str]:
+    """Wrap _parse_module_handlers to record which plugins get parsed."""
+    parsed: list[str] = []
+    parse_module_handlers = plugin._parse_module_handlers
+
+    def counted(plugin_name: str, handlers: list) -> list:
+        parsed.append(plugin_name)
+        return parse_module_handlers(plugin_name, handlers)
+
+    plugin._parse_module_handlers = counted
+    return parsed
+
+
+def test_metadata_cache_reuses_unchanged_modules(tmp_path: Path) -> None:
+    async def scenario() -> None:
+        plugin, _ = make_plugin(tmp_path)
+        parsed = count_module_parses(plugin)
+        first = await plugin._collect_items_from_metadata()
+        assert parsed == ["Plugin0", "Plugin1", "Plugin2"]
+
+        parsed.clear()
+        assert await plugin._collect_items_from_metadata() is first
+        assert parsed == []
+
+        # Fresh handler objects are re-parsed even without a plugin event. The
+        # old ones are released first so their ids are free for reuse.
+        del REGISTRY[3:6]
+        REGISTRY[3:3] = [Handler("plugins.plugin1.main", f"new{i}") for i in range(3)]
+        public, _ = await plugin._collect_items_from_metadata()
+        assert parsed == ["Plugin1"]
+        assert sum(item.command.startswith("new") for item in public) == 3
+
+    asyncio.run(scenario())
+
+
+def test_plugin_events_reparse_only_the_changed_module(tmp_path: Path) -> None:
+    async def scenario() -> None:
+        plugin, context = make_plugin(
+            tmp_path, auto_refresh_quiet_seconds=0, auto_refresh_max_delay_seconds=0
+        )
+        await plugin._refresh_help_cache(force=True)
+        parsed = count_module_parses(plugin)
+
+        await plugin.on_plugin_loaded(context.stars[1])
+        await plugin._plugin_refresh_task
+        assert parsed == ["Plugin1"]
+
+        parsed.clear()
+        await plugin.on_plugin_unloaded(context.stars[0])
+        await plugin._plugin_refresh_task
+        assert parsed == ["Plugin0"]
+        await plugin.terminate()
+
+    asyncio.run(scenario())
+
+
+def test_metadata_cache_evicts_removed_plugins(tmp_path: Path) -> None:
+    async def scenario() -> None:
+        plugin, context = make_plugin(
+            tmp_path, auto_refresh_quiet_seconds=0, auto_refresh_max_delay_seconds=0
+        )
+        await plugin._refresh_help_cache(force=True)
+        parsed = count_module_parses(plugin)
+
+        removed = context.stars.pop(2)
+        REGISTRY[6:9] = []
+        await plugin.on_plugin_unloaded(removed)
+        await plugin._plugin_refresh_task
+        assert parsed == []
+        assert set(plugin._metadata_module_cache) == {
+            "plugins.plugin0.main",
+            "plugins.plugin1.main",
+        }
+        assert plugin._help_cache.public.total_items == 6
+        await plugin.terminate()
+
+    asyncio.run(scenario())
+
+
+def test_plain_helpmenu_reads_the_page_without_locking(tmp_path: Path) -> None:
+    async def scenario() -> tuple[list, list[int], int]:
+        plugin, context = make_plugin(tmp_path)
+        populate(context, plugins=10, commands=30)
+        await plugin._refresh_help_cache(force=True)
+        store = plugin._session_page
+        locks: list[str] = []
+        writes: list[int] = []
+        lock_for, set_position = store.lock_for, store.set
+
+        def counted_lock_for(key: str) -> asyncio.Lock:
+            locks.append(key)
+            return lock_for(key)
+
+        def counted_set(key: str, page: int, *args) -> None:
+            writes.append(page)
+            set_position(key, page, *args)
+
+        store.lock_for, store.set = counted_lock_for, counted_set
+
+        texts = []
+        for message in ("/helpMenu", "/helpMenu 2", "/helpMenu", "/helpMenu"):
+            texts.extend(await collect(plugin.helpmenu(FakeEvent(message))))
+        assert len(locks) == 1
+        await collect(plugin.helpmenu(FakeEvent("/helpMenu next")))
+        await plugin.terminate()
+        pages = plugin._help_cache.public.pages
+        return [pages.index(text) + 1 for _, text in texts], writes, len(locks)
+
+    shown, writes, locked = asyncio.run(scenario())
+
+    assert shown == [1, 2, 2, 2]
+    assert writes == [2, 3]
+    assert locked == 2
+
+
+def test_rapid_navigation_renders_only_the_latest_page(tmp_path: Path) -> None:
+    async def scenario() -> tuple[list, list[int], int]:
+        plugin, context = make_plugin(tmp_path, output_mode="image")
+        populate(context, plugins=10, commands=30)
+        await plugin._refresh_help_cache(force=True)
+        assert len(plugin._help_cache.public.image_pages) >= 6
+        gate = asyncio.Event()
+        requested, finished = fake_renders(plugin, gate)
+
+        requests = []
+        for page in range(2, 7):
+            requests.append(
+                asyncio.create_task(
+                    collect(plugin.helpmenu(FakeEvent(f"/helpMenu {page}")))
+                )
+            )
+            await until(lambda page=page: requested[-1:] == [page])
+        gate.set()
+        results = await asyncio.gather(*requests)
+        await plugin.terminate()
+        return results, finished, plugin._suppressed_renders
+
+    results, finished, suppressed = asyncio.run(scenario())
+
+    assert results == [[], [], [], [], [("image", "page-6.png")]]
+    assert finished == [6]
+    assert suppressed == 4
+
+
+def test_identical_page_requests_share_one_render(tmp_path: Path) -> None:
+    async def scenario() -> tuple[list, list[int]]:
+        plugin, _ = make_plugin(tmp_path, output_mode="image")
+        await plugin._refresh_help_cache(force=True)
+        gate = asyncio.Event()
+        requested, finished = fake_renders(plugin, gate)
+
+        requests = [
+            asyncio.create_task(collect(plugin.helpmenu(FakeEvent("/helpMenu 1"))))
+            for _ in range(3)
+        ]
+        await until(lambda: len(requested) == 3)
+        gate.set()
+        results = await asyncio.gather(*requests)
+        await plugin.terminate()
+        return results, finished
+
+    results, finished = asyncio.run(scenario())
+
+    assert results == [[("image", "page-1.png")]] * 3
+    assert finished == [1]
+
+
+def test_cancelled_request_does_not_cancel_a_shared_render(tmp_path: Path) -> None:
+    async def scenario() -> tuple[list, list[int], int]:
+        plugin, _ = make_plugin(tmp_path, output_mode="image")
+        await plugin._refresh_help_cache(force=True)
+        gate = asyncio.Event()
+        requested, finished = fake_renders(plugin, gate)
+
+        cancelled, waiting = (
+            asyncio.create_task(collect(plugin.helpmenu(FakeEvent("/helpMenu 1"))))
+            for _ in range(2)
+        )
+        await until(lambda: len(requested) == 2)
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        gate.set()
+        result = await waiting
+        await plugin.terminate()
+        return result, finished, plugin._suppressed_renders
+
+    result, finished, suppressed = asyncio.run(scenario())
+
+    assert result == [("image", "page-1.png")]
+    assert finished == [1]
+    assert suppressed == 0
+
+
+def test_readers_keep_the_previous_version_during_a_refresh(tmp_path: Path) -> None:
+    async def scenario() -> tuple[list, list, int]:
+        plugin, context = make_plugin(tmp_path)
+        await plugin._refresh_help_cache(force=True)
+        gate = asyncio.Event()
+        stats = count_refreshes(plugin, gate)
+
+        populate(context, plugins=4)
+        refresh = asyncio.create_task(plugin._refresh_help_cache(require_newer=True))
+        await until(lambda: stats["active"] == 1)
+        during = await collect(plugin.helpmenu(FakeEvent("/helpMenu")))
+        gate.set()
+        assert (await refresh)[0]
+        after = await collect(plugin.helpmenu(FakeEvent("/helpMenu")))
+        await plugin.terminate()
+        return during, after, plugin._help_cache.version
+
+    during, after, version = asyncio.run(scenario())
+
+    assert "命令数: 9 " in during[0][1]
+    assert "命令数: 12 " in after[0][1]
+    assert version == 2
+
+
+def run_plugin_change_storm(
+    tmp_path: Path, events: int, interval: float
+) -> tuple[list[int], object]:
+    """Feed plugin-load events ``interval`` virtual seconds apart.
+
+    Returns the batch size of every refresh that ran and the plugin.
+    """
+
+    async def scenario():
+        plugin, _ = make_plugin(
+            tmp_path,
+            auto_refresh_quiet_seconds=1,
+            auto_refresh_max_delay_seconds=3,
+        )
+        clock = VirtualClock()
+        plugin._clock = clock
+        plugin._sleep = clock.sleep
+        batches: list[int] = []
+        seen = [0]
+
+        async def record_refresh(force: bool) -> tuple[bool, str]:
+            batches.append(plugin._auto_refresh_coalesced_events - seen[0])
+            seen[0] = plugin._auto_refresh_coalesced_events
+            return True, "ok"
+
+        plugin._run_refresh = record_refresh
+        for index in range(events):
+            await plugin.on_plugin_loaded(StarMetadata(f"storm{index}"))
+            await clock.advance(interval)
+        await clock.advance(5)
+        await plugin.terminate()
+        return batches, plugin
+
+    return asyncio.run(scenario())
+
+
+def test_plugin_change_burst_triggers_one_refresh(tmp_path: Path) -> None:
+    batches, plugin = run_plugin_change_storm(tmp_path, events=10, interval=0)
+
+    assert batches == [10]
+    assert plugin._auto_refresh_count == 1
+    assert plugin._auto_refresh_max_batch == 10
+
+
+def test_endless_plugin_changes_still_refresh_after_max_delay(tmp_path: Path) -> None:
+    # Events arrive every 0.5 s, always inside the 1 s quiet window, for 10 s.
+    batches, plugin = run_plugin_change_storm(tmp_path, events=20, interval=0.5)
+
+    assert batches == [6, 6, 6, 2]
+    assert plugin._auto_refresh_count == 4
+    assert plugin._auto_refresh_max_batch == 6
+    assert plugin._auto_refresh_coalesced_events == 20
+
+
+def test_periodic_refresh_skips_builds_for_unchanged_fetches(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    builds: list[int] = []
+    build_help_snapshots = MAIN.build_help_snapshots
+
+    def counted_build(*args):
+        builds.append(len(args[3]))
+        return build_help_snapshots(*args)
+
+    monkeypatch.setattr(MAIN, "build_help_snapshots", counted_build)
+    dashboard = FakeDashboard(["ping"])
+    monkeypatch.setattr(MAIN, "DashboardPool", lambda *args, **kwargs: dashboard)
+
+    async def scenario() -> tuple[int, int]:
+        plugin, _ = make_plugin(
+            tmp_path,
+            fetch_mode="api",
+            periodic_refresh_minutes=1,
+            periodic_refresh_jitter_seconds=0,
+        )
+        parked = ParkedSleep()
+        plugin._sleep = parked
+        await plugin.initialize()
+        await plugin._startup_refresh_task
+        assert dashboard.fetches == 1
+        assert builds == [1]
+
+        dashboard.unchanged = True
+        delay, wake = await parked.next()
+        for _ in range(3):
+            assert delay == 60.0
+            wake.set_result(None)
+            delay, wake = await parked.next()
+        assert dashboard.fetches == 4
+        assert builds == [1]
+
+        dashboard.items = FakeDashboard(["ping", "pong"]).items
+        dashboard.unchanged = False
+        wake.set_result(None)
+        await parked.next()
+        assert dashboard.fetches == 5
+        await plugin.terminate()
+        return plugin._help_cache.version, plugin._help_cache.public.total_items
+
+    assert asyncio.run(scenario()) == (2, 2)
+    assert builds == [1, 2]
+
+
+def test_unchanged_fetch_rebuilds_after_a_failed_build(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async def scenario() -> None:
+        plugin, _ = make_plugin(tmp_path, fetch_mode="api")
+        dashboard = FakeDashboard(["ping"])
+        plugin._api_client = dashboard
+        assert (await plugin._refresh_help_cache(force=True))[0]
+
+        # The dashboard now serves a new list, but building it fails once.
+        dashboard.items = FakeDashboard(["ping", "pong"]).items
+        build_help_snapshots = MAIN.build_help_snapshots
+
+        def broken_build(*args):
+            monkeypatch.setattr(MAIN, "build_help_snapshots", build_help_snapshots)
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(MAIN, "build_help_snapshots", broken_build)
+        ok, _ = await plugin._refresh_help_cache(force=True)
+        assert not ok
+
+        # The next fetch is a 304 for the list that never made it into the cache.
+        dashboard.unchanged = True
+        assert (await plugin._refresh_help_cache(force=True))[0]
+        assert plugin._help_cache.public.total_items == 2
+        assert plugin._help_cache.version == 2
+
+        # Once built, further 304s skip the build again.
+        monkeypatch.setattr(MAIN, "build_help_snapshots", broken_build)
+        assert (await plugin._refresh_help_cache(force=True))[0]
+        assert plugin._help_cache.version == 2
+        await plugin.terminate()
+
+    asyncio.run(scenario())
+
+
+def test_helpmenu_reports_building_while_startup_refresh_runs(
+    tmp_path: Path,
+) -> None:
+    async def scenario() -> tuple[list, list, int]:
+        plugin, _ = make_plugin(tmp_path)
+        plugin._STARTUP_WAIT_SECONDS = 0
+        gate = asyncio.Event()
+        stats = count_refreshes(plugin, gate)
+        await plugin.initialize()
+
+        building = await collect(plugin.helpmenu(FakeEvent("/helpMenu")))
+        assert plugin._readiness == plugin._READINESS_BUILDING
+        gate.set()
+        await plugin._startup_refresh_task
+        ready = await collect(plugin.helpmenu(FakeEvent("/helpMenu")))
+        await plugin.terminate()
+        return building, ready, stats["runs"]
+
+    building, ready, runs = asyncio.run(scenario())
+
+    assert building == [("text", "帮助菜单正在生成中，请稍后再试。")]
+    assert ready[0][1].startswith("指令帮助菜单")
+    assert runs == 1
+
+
+def test_helpmenu_waits_briefly_for_a_fast_startup_refresh(tmp_path: Path) -> None:
+    async def scenario() -> tuple[list, str, int]:
+        plugin, _ = make_plugin(tmp_path)
+        stats = count_refreshes(plugin)
+        await plugin.initialize()
+
+        results = await collect(plugin.helpmenu(FakeEvent("/helpMenu")))
+        readiness = plugin._readiness
+        await plugin.terminate()
+        return results, readiness, stats["runs"]
+
+    results, readiness, runs = asyncio.run(scenario())
+
+    assert results[0][1].startswith("指令帮助菜单")
+    assert readiness == MAIN.MyPlugin._READINESS_READY
+    assert runs == 1
+
+
+def save_snapshot(tmp_path: Path, **config) -> bytes:
+    """Refresh a plugin with snapshot persistence on and return the saved file."""
+
+    async def scenario() -> None:
+        plugin, _ = make_plugin(tmp_path, persist_help_snapshot=True, **config)
+        assert (await plugin._refresh_help_cache(force=True))[0]
+        await plugin.terminate()
+
+    asyncio.run(scenario())
+    return (tmp_path / "help_snapshot.json").read_bytes()
+
+
+def test_saved_snapshot_is_served_before_the_startup_refresh(tmp_path: Path) -> None:
+    save_snapshot(tmp_path)
+
+    async def scenario() -> tuple[list, int]:
+        plugin, _ = make_plugin(tmp_path, persist_help_snapshot=True)
+        gate = asyncio.Event()
+        stats = count_refreshes(plugin, gate)
+        await plugin.initialize()
+        assert plugin._readiness == plugin._READINESS_READY
+        loaded = plugin._help_cache
+
+        results = await collect(plugin.helpmenu(FakeEvent("/helpMenu")))
+        # An unchanged registry keeps the loaded version instead of rebuilding it.
+        gate.set()
+        await plugin._startup_refresh_task
+        assert plugin._help_cache is loaded
+        await plugin.terminate()
+        return results, stats["runs"]
+
+    results, runs = asyncio.run(scenario())
+
+    assert results[0][1].startswith("指令帮助菜单")
+    assert "命令数: 9 " in results[0][1]
+    assert runs == 1
+
+
+def test_startup_refresh_replaces_an_outdated_snapshot(tmp_path: Path) -> None:
+    save_snapshot(tmp_path)
+
+    async def scenario() -> tuple[int, int]:
+        plugin, context = make_plugin(tmp_path, persist_help_snapshot=True)
+        populate(context, plugins=4)
+        await plugin.initialize()
+        assert plugin._help_cache.public.total_items == 9
+        await plugin._startup_refresh_task
+        await plugin.terminate()
+        return plugin._help_cache.version, plugin._help_cache.public.total_items
+
+    assert asyncio.run(scenario()) == (2, 12)
+
+
+def test_snapshot_from_another_fetch_mode_is_ignored(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    save_snapshot(tmp_path)
+    monkeypatch.setattr(
+        MAIN, "DashboardPool", lambda *args, **kwargs: FakeDashboard(["ping"])
+    )
+
+    async def scenario() -> None:
+        plugin, _ = make_plugin(tmp_path, persist_help_snapshot=True, fetch_mode="api")
+        await plugin._load_help_snapshot()
+        assert not plugin._help_cache.ready
+        assert plugin._readiness == plugin._READINESS_BUILDING
+
+    asyncio.run(scenario())
+
+
+def test_corrupt_snapshot_is_ignored(tmp_path: Path) -> None:
+    (tmp_path / "help_snapshot.json").write_bytes(b'{"format": 1, "public": ')
+
+    async def scenario() -> tuple[int, str]:
+        plugin, _ = make_plugin(tmp_path, persist_help_snapshot=True)
+        await plugin._load_help_snapshot()
+        assert not plugin._help_cache.ready
+        assert plugin._readiness == plugin._READINESS_BUILDING
+        await plugin.initialize()
+        await plugin._startup_refresh_task
+        await plugin.terminate()
+        return plugin._help_cache.version, plugin._readiness
+
+    assert asyncio.run(scenario()) == (1, MAIN.MyPlugin._READINESS_READY)
+    # The rebuilt snapshot overwrites the corrupt file.
+    assert b'"total_items":9' in (tmp_path / "help_snapshot.json").read_bytes()
+
+
+def test_snapshot_is_replaced_atomically(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    saved = save_snapshot(tmp_path)
+    assert not (tmp_path / "help_snapshot.json.tmp").exists()
+    replaced: list[tuple[str, str]] = []
+
+    def failing_replace(source, target) -> None:
+        replaced.append((Path(source).name, Path(target).name))
+        raise OSError("disk full")
+
+    monkeypatch.setattr(MAIN.os, "replace", failing_replace)
+
+    async def scenario() -> int:
+        plugin, context = make_plugin(tmp_path, persist_help_snapshot=True)
+        populate(context, plugins=4)
+        assert (await plugin._refresh_help_cache(force=True))[0]
+        await plugin.terminate()
+        return plugin._help_cache.public.total_items
+
+    assert asyncio.run(scenario()) == 12
+    # The new snapshot only ever went to the temporary file.
+    assert replaced == [("help_snapshot.json.tmp", "help_snapshot.json")]
+    assert (tmp_path / "help_snapshot.json").read_bytes() == saved
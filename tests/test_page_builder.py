@@ -0,0 +1,65 @@
+from importlib import util
+from pathlib import Path
+
+MODULE_PATH = Path(__file__).resolve().parent.parent / "page_builder.py"
+SPEC = util.spec_from_file_location("page_builder", MODULE_PATH)
+assert SPEC and SPEC.loader
+PAGE_BUILDER = util.module_from_spec(SPEC)
+SPEC.loader.exec_module(PAGE_BUILDER)
+CommandDocItem = PAGE_BUILDER.CommandDocItem
+PageIndex = PAGE_BUILDER.PageIndex
+build_pages = PAGE_BUILDER.build_pages
+
+
+def make_items(plugin_counts: dict[str, int]) -> list[CommandDocItem]:
+    return [
+        CommandDocItem(plugin_name, f"{plugin_name}_{index}", "demo", [])
+        for plugin_name, count in plugin_counts.items()
+        for index in range(count)
+    ]
+
+
+def test_build_pages_records_plugin_page_index() -> None:
+    page_index = PageIndex()
+    pages = build_pages(
+        make_items({"alpha": 5, "beta": 5, "gamma": 2}),
+        12,
+        "now",
+        "metadata",
+        page_size=8,
+        page_index=page_index,
+    )
+
+    for plugin_name, page in page_index.first_page.items():
+        assert f"[{plugin_name}]" in pages[page - 1]
+    assert len(page_index.page_anchor) == len(pages)
+
+
+def test_page_index_locates_anchor_after_rebuild() -> None:
+    old_index = PageIndex()
+    build_pages(
+        make_items({"beta": 6, "gamma": 6}),
+        12,
+        "now",
+        "metadata",
+        page_size=8,
+        page_index=old_index,
+    )
+    new_index = PageIndex()
+    new_pages = build_pages(
+        make_items({"alpha": 6, "beta": 6, "gamma": 6}),
+        18,
+        "now",
+        "metadata",
+        page_size=8,
+        page_index=new_index,
+    )
+
+    old_page = old_index.first_page["gamma"]
+    anchor = old_index.anchor_of(old_page)
+    new_page = new_index.locate(old_page, anchor, len(new_pages))
+
+    assert anchor == "gamma"
+    assert new_page == new_index.first_page["gamma"]
+    assert "[gamma]" in new_pages[new_page - 1]
+    assert new_index.locate(new_page, anchor, len(new_pages)) == new_page
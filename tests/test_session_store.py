@@ -0,0 +1,138 @@
+import asyncio
+import sys
+import types
+from importlib import util
+from pathlib import Path
+
+fake_astrbot = types.ModuleType("astrbot")
+fake_astrbot_api = types.ModuleType("astrbot.api")
+fake_astrbot_api.logger = types.SimpleNamespace(warning=lambda *args, **kwargs: None)
+fake_astrbot.api = fake_astrbot_api
+sys.modules.setdefault("astrbot", fake_astrbot)
+sys.modules.setdefault("astrbot.api", fake_astrbot_api)
+
+MODULE_PATH = Path(__file__).resolve().parent.parent / "session_store.py"
+SPEC = util.spec_from_file_location("session_store", MODULE_PATH)
+assert SPEC and SPEC.loader
+SESSION_STORE = util.module_from_spec(SPEC)
+SPEC.loader.exec_module(SESSION_STORE)
+ShardedSessionStore = SESSION_STORE.ShardedSessionStore
+SessionPageDatabase = SESSION_STORE.SessionPageDatabase
+SessionPosition = SESSION_STORE.SessionPosition
+
+
+def test_sharded_session_store_evicts_least_recently_written() -> None:
+    evicted: list[str] = []
+    store = ShardedSessionStore(max_size=2, on_evict=evicted.append)
+
+    store.set("a", 1)
+    store.set("b", 2)
+    store.set("a", 3)
+    store.set("c", 4)
+
+    assert evicted == ["b"]
+    assert store.evictions == 1
+    assert store.get("a") == 3
+    assert store.get("b") is None
+    assert len(store) == 2
+
+
+def test_sharded_session_store_bounds_the_whole_store_not_each_shard() -> None:
+    evicted: list[str] = []
+    store = ShardedSessionStore(max_size=64, on_evict=evicted.append)
+
+    for index in range(64):
+        store.set(f"session-{index}", index)
+    assert evicted == []
+    assert len(store) == 64
+
+    store.set("session-0", 100)
+    store.set("session-64", 64)
+
+    assert evicted == ["session-1"]
+    assert len(store) == 64
+    assert store.get("session-0") == 100
+
+
+def test_sharded_session_store_serializes_same_session_updates() -> None:
+    store = ShardedSessionStore(max_size=64, shard_count=8)
+
+    async def next_page(key: str) -> None:
+        async with store.lock_for(key):
+            page = store.get(key) or 1
+            await asyncio.sleep(0)
+            store.set(key, page + 1)
+
+    async def burst() -> None:
+        await asyncio.gather(*(next_page(f"group-{index % 4}") for index in range(40)))
+
+    asyncio.run(burst())
+
+    assert [store.get(f"group-{index}") for index in range(4)] == [11, 11, 11, 11]
+
+
+def test_sharded_session_store_restores_pages_from_database(tmp_path: Path) -> None:
+    database_path = tmp_path / "session_pages.sqlite3"
+
+    async def navigate_and_close() -> None:
+        store = ShardedSessionStore(max_size=8, flush_interval=60)
+        store.enable_persistence(SessionPageDatabase(database_path))
+        store.set("group-1", 3, "public:text", "plugin_2")
+        store.set("group-2", 5)
+        await store.close()
+
+    async def reopen() -> tuple[SessionPosition | None, int | None]:
+        store = ShardedSessionStore(max_size=8)
+        store.enable_persistence(SessionPageDatabase(database_path))
+        assert store.get("group-1") is None
+        async with store.lock_for("group-1"):
+            await store.load("group-1")
+        restored = store.get_position("group-1"), store.get("group-2")
+        await store.close()
+        return restored
+
+    asyncio.run(navigate_and_close())
+
+    assert asyncio.run(reopen()) == (
+        SessionPosition(3, "public:text", "plugin_2"),
+        None,
+    )
+
+
+def test_sharded_session_store_expires_idle_sessions(monkeypatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr(
+        SESSION_STORE,
+        "time",
+        types.SimpleNamespace(monotonic=lambda: now[0], time=lambda: now[0]),
+    )
+    store = ShardedSessionStore(max_size=16, shard_count=2, ttl_seconds=640)
+
+    store.set("idle", 2)
+    now[0] += 400
+    store.set("active", 3)
+    now[0] += 300
+
+    assert store.get("idle") is None
+    assert store.get("active") == 3
+
+    store.set("trigger-sweep", 1)
+
+    assert store.expirations == 1
+    assert store.evictions == 0
+    assert len(store) == 2
+
+
+def test_sharded_session_store_remaps_positions_with_resolver() -> None:
+    new_pages = {"beta": 4}
+
+    def resolver(position):
+        return position._replace(page=new_pages.get(position.anchor, position.page))
+
+    store = ShardedSessionStore(max_size=8, resolver=resolver)
+    store.set("group-1", 2, "public:text", "beta")
+    store.set("group-2", 3, "public:text", "removed")
+
+    assert store.remap() == 1
+    assert store.get_position("group-1") == (4, "public:text", "beta")
+    assert store.get("group-2") == 3
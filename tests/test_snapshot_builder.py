@@ -0,0 +1,81 @@
+import sys
+import types
+from importlib import util
+from pathlib import Path
+
+import pytest
+
+PLUGIN_ROOT = Path(__file__).resolve().parent.parent
+PACKAGE_NAME = "helpmenu_plugin"
+
+if PACKAGE_NAME not in sys.modules:
+    fake_package = types.ModuleType(PACKAGE_NAME)
+    fake_package.__path__ = [str(PLUGIN_ROOT)]
+    sys.modules[PACKAGE_NAME] = fake_package
+
+SPEC = util.spec_from_file_location(
+    f"{PACKAGE_NAME}.snapshot_builder", PLUGIN_ROOT / "snapshot_builder.py"
+)
+assert SPEC and SPEC.loader
+SNAPSHOT_BUILDER = util.module_from_spec(SPEC)
+# dataclasses resolves string annotations through sys.modules.
+sys.modules[SPEC.name] = SNAPSHOT_BUILDER
+SPEC.loader.exec_module(SNAPSHOT_BUILDER)
+build_help_snapshots = SNAPSHOT_BUILDER.build_help_snapshots
+dump_help_cache = SNAPSHOT_BUILDER.dump_help_cache
+load_help_cache = SNAPSHOT_BUILDER.load_help_cache
+HelpCacheVersion = SNAPSHOT_BUILDER.HelpCacheVersion
+split_permission_tiers = SNAPSHOT_BUILDER.split_permission_tiers
+CommandDocItem = sys.modules[f"{PACKAGE_NAME}.page_builder"].CommandDocItem
+
+
+def make_candidates() -> list:
+    return [
+        CommandDocItem("beta", "b", "demo", [], "admin"),
+        CommandDocItem("Alpha", "a2", "demo", []),
+        CommandDocItem("Alpha", "a1", "demo", [], "member"),
+        CommandDocItem("Alpha", "a1", "duplicate", []),
+    ]
+
+
+def test_split_permission_tiers_sorts_and_dedups() -> None:
+    public_items, admin_items = split_permission_tiers(make_candidates())
+
+    assert [item.command for item in public_items] == ["a1", "a2"]
+    assert [item.command for item in admin_items] == ["a1", "a2", "b"]
+    assert public_items[0].description == "demo"
+
+
+def test_build_help_snapshots_skips_unchanged_inputs() -> None:
+    public_items, admin_items = split_permission_tiers(make_candidates())
+    signature = [[["alpha", "plugins.alpha.main"]], 4]
+
+    fingerprint, snapshots = build_help_snapshots(
+        "metadata", "api", signature, public_items, admin_items, "", "now"
+    )
+
+    assert snapshots is not None
+    public, admin_private = snapshots
+    assert public.total_items == 2
+    assert admin_private.total_items == 3
+    assert public.page_index.first_page == {"Alpha": 1}
+    assert build_help_snapshots(
+        "metadata", "api", signature, public_items, admin_items, fingerprint, "later"
+    ) == (fingerprint, None)
+
+
+def test_help_cache_round_trips_through_json() -> None:
+    public_items, admin_items = split_permission_tiers(make_candidates())
+    fingerprint, (public, admin_private) = build_help_snapshots(
+        "metadata", "api", None, public_items, admin_items, "", "now"
+    )
+    cache = HelpCacheVersion(7, fingerprint, public, admin_private)
+
+    restored = load_help_cache(dump_help_cache(cache), 1)
+
+    assert restored.version == 1
+    assert restored.fingerprint == fingerprint
+    assert restored.public == public
+    assert restored.admin_private == admin_private
+    with pytest.raises(ValueError):
+        load_help_cache(b'{"format": 0}', 1)